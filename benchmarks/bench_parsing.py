@@ -0,0 +1,66 @@
+'''
+Offline parsing benchmarks on the pages in benchmarks/fixtures.
+
+    pip install pytest-benchmark
+    cd benchmarks && python -m pytest --benchmark-save=baseline
+    cd benchmarks && python -m pytest --benchmark-compare=0001_baseline
+
+extra_info of each benchmark holds items (tweets or users) per second and
+the peak traced allocation per item.
+'''
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from bs4 import BeautifulSoup
+
+from twint import extract, feed, format, tweet, user
+from twint.storage import write_meta
+
+PARSERS = ["bs4", "lxml"]
+
+def _tweets(page, config, parser):
+    config.Parser = parser
+    elements, _ = feed.Json(page, parser)
+    build = extract.Tweet if parser == "lxml" else tweet.Tweet
+    return [build(tw, config) for tw in elements]
+
+@pytest.mark.parametrize("parser", PARSERS)
+def bench_feed_json(measure, search_page, parser):
+    elements, cursor = measure(lambda: feed.Json(search_page, parser), 20)
+    assert len(elements) == 20 and cursor
+
+def bench_feed_mobile(measure, favorites_page):
+    elements, cursor = measure(lambda: feed.Mobile(favorites_page), 20)
+    assert len(elements) == 20 and cursor
+
+def bench_feed_follow(measure, followers_page):
+    elements, cursor = measure(lambda: feed.Follow(followers_page), 20)
+    assert len(elements) == 20 and cursor
+
+@pytest.mark.parametrize("parser", PARSERS)
+def bench_tweet(measure, search_page, config, parser):
+    config.Parser = parser
+    build = extract.Tweet if parser == "lxml" else tweet.Tweet
+
+    def run(elements):
+        return [build(tw, config) for tw in elements]
+
+    tweets = measure(run, 20, setup=lambda: (feed.Json(search_page, parser)[0],))
+    assert len(tweets) == 20
+
+def bench_user(measure, profile_page):
+    u = measure(user.User, 1, setup=lambda: (BeautifulSoup(profile_page, "html.parser"),))
+    assert u.username == "user1000"
+
+@pytest.mark.parametrize("template", [None, "{id} {date} {time} <{username}> {tweet} {hashtags} {likes}"])
+def bench_format_tweet(measure, search_page, config, template):
+    config.Format = template
+    tweets = _tweets(search_page, config, "lxml")
+    lines = measure(lambda: [format.Tweet(config, t) for t in tweets], len(tweets))
+    assert len(lines) == 20
+
+def bench_tweet_data(measure, search_page, config):
+    tweets = _tweets(search_page, config, "lxml")
+    rows = measure(lambda: [write_meta.tweetData(t) for t in tweets], len(tweets))
+    assert len(rows) == 20
@@ -0,0 +1,69 @@
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import twint
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+@pytest.fixture(scope="session")
+def search_page():
+    return fixture("search.json")
+
+@pytest.fixture(scope="session")
+def favorites_page():
+    return fixture("mobile_favorites.html")
+
+@pytest.fixture(scope="session")
+def followers_page():
+    return fixture("followers.html")
+
+@pytest.fixture(scope="session")
+def profile_page():
+    return fixture("profile.html")
+
+@pytest.fixture
+def config():
+    c = twint.Config()
+    c.TwitterSearch = True
+    c.Hide_output = True
+    return c
+
+def _peak(fn, *args):
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+@pytest.fixture
+def measure(benchmark):
+    """Benchmark fn over `items` tweets/users per call, recording items/sec
+    and the peak traced allocation per item in extra_info
+
+    With setup, each round calls fn on a fresh result of setup() since
+    the bs4 builders modify the elements they read.
+    """
+    def _measure(fn, items, setup=None, rounds=20):
+        if setup is None:
+            result = benchmark(fn)
+        else:
+            result = benchmark.pedantic(fn, setup=lambda: (setup(), {}), rounds=rounds)
+        if benchmark.stats is None:
+            # --benchmark-disable runs fn once without timing it
+            return result
+        peak = _peak(fn) if setup is None else _peak(fn, *setup())
+        benchmark.extra_info["items"] = items
+        benchmark.extra_info["items_per_sec"] = round(items / benchmark.stats.stats.mean, 1)
+        benchmark.extra_info["peak_bytes_per_item"] = round(peak / items)
+        return result
+    return _measure
@@ -0,0 +1,92 @@
+'''
+end_to_end.py - End-to-end scrape throughput against the local stand-in.
+
+Starts benchmarks/standin.py in a background thread and runs twint's
+search, profile, favorites and followers scrapes against it, printing
+items/sec for each.
+
+    python benchmarks/end_to_end.py --pages 20 --latency 0.05 --parser lxml
+    python benchmarks/end_to_end.py --modes search --error-rate 0.05 --rate-limit-every 7
+'''
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import twint
+
+import standin
+
+def serve(app):
+    """Run the stand-in in its own event loop thread, return its base url
+    """
+    started = threading.Event()
+    address = {}
+
+    def _run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        runner, address["url"] = loop.run_until_complete(standin.start(app))
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=_run, daemon=True).start()
+    started.wait()
+    return address["url"]
+
+def config(base_url, args):
+    c = twint.Config()
+    c.Base_url = base_url
+    c.Mobile_url = base_url + "/mobile"
+    c.Username = "user1000"
+    c.Search = "python"
+    c.Parser = args.parser
+    c.Parse_workers = args.parse_workers
+    c.Prefetch = args.prefetch
+    c.Multi_concurrency = args.multi_concurrency
+    c.Retries_count = args.retries
+    c.Hide_output = True
+    c.Store_object = True
+    c.Pandas_au = False
+    return c
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--modes", nargs="+", default=["search", "profile", "favorites", "followers"],
+                    choices=["search", "profile", "favorites", "followers"])
+    ap.add_argument("--pages", type=int, default=10)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--rate-limit-every", type=int, default=0)
+    ap.add_argument("--parser", choices=["bs4", "lxml"], default="bs4")
+    ap.add_argument("--parse-workers", type=int, default=0)
+    ap.add_argument("--prefetch", type=int, default=2)
+    ap.add_argument("--multi-concurrency", type=int, default=20)
+    ap.add_argument("--retries", type=int, default=10)
+    args = ap.parse_args()
+
+    app = standin.make_app(args.pages, args.latency, args.error_rate, args.rate_limit_every, seed=1)
+    base_url = serve(app)
+    runs = {
+        "search": (twint.run.Search, lambda: twint.output.tweets_list),
+        "profile": (twint.run.Profile, lambda: twint.output.tweets_list),
+        "favorites": (twint.run.Favorites, lambda: twint.output.tweets_list),
+        "followers": (twint.run.Followers, lambda: twint.output.follows_list),
+    }
+    for mode in args.modes:
+        scrape, results = runs[mode]
+        twint.output.clean_lists()
+        requests = app["state"]["requests"]
+        start = time.perf_counter()
+        scrape(config(base_url, args))
+        elapsed = time.perf_counter() - start
+        items = len(results())
+        print(f"{mode:<10} {items:6d} items {elapsed:7.2f}s {items / elapsed:9.1f} items/sec "
+              f"{app['state']['requests'] - requests:5d} requests")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+'''
+parse_workers.py - Feed page parsing throughput versus parse worker count.
+
+Parses the recorded search page in benchmarks/fixtures through
+twint.parse, inline and with 1..N worker processes, and prints pages/sec.
+
+    python benchmarks/parse_workers.py --pages 200 --workers 0 1 2 4 --parser lxml
+'''
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import twint
+from twint import parse
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "search.json")
+
+def config(workers, parser):
+    c = twint.Config()
+    c.TwitterSearch = True
+    c.Parse_workers = workers
+    c.Parser = parser
+    return c
+
+async def pages_per_second(response, pages, workers, parser):
+    c = config(workers, parser)
+    start = time.perf_counter()
+    if workers:
+        # keep every worker busy, like the fetcher does with several queries
+        await asyncio.gather(*[parse.Page(response, c) for _ in range(pages)])
+    else:
+        for _ in range(pages):
+            parse._page(response, False, parse._options(c))
+    return pages / (time.perf_counter() - start)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, default=100)
+    ap.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    ap.add_argument("--parser", choices=["bs4", "lxml"], default="bs4")
+    args = ap.parse_args()
+
+    with open(FIXTURE, encoding="utf-8") as f:
+        response = f.read()
+
+    loop = asyncio.get_event_loop()
+    print(f"{args.parser}, {args.pages} pages, {os.cpu_count()} cpus")
+    for workers in args.workers:
+        if workers:
+            # start the pool before timing
+            loop.run_until_complete(parse.Page(response, config(workers, args.parser)))
+        rate = loop.run_until_complete(pages_per_second(response, args.pages, workers, args.parser))
+        print(f"workers={workers:<3} {rate:8.1f} pages/sec")
+    parse.close()
+
+if __name__ == "__main__":
+    main()
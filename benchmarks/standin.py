@@ -0,0 +1,163 @@
+'''
+standin.py - Local stand-in for the Twitter endpoints twint scrapes.
+
+Serves the pages in benchmarks/fixtures with working paging cursors, so
+twint can be pointed at it with --base-url and --mobile-url:
+
+    python benchmarks/standin.py --port 8080 --pages 50 --latency 0.05
+    twint -s python --base-url http://127.0.0.1:8080 --mobile-url http://127.0.0.1:8080/mobile
+
+Endpoints:
+    /i/search/timeline                      search pages (JSON)
+    /i/profiles/show/<user>/timeline/tweets profile pages (JSON)
+    /mobile/<user>, /mobile/<user>/favorites,
+    /mobile/<user>/followers,
+    /mobile/<user>/following                mobile pages
+    /<user>/status/<id>                     single tweet pages
+    /<user>                                 profile page
+    /intent/user                            user id lookup
+
+--error-rate answers that share of requests with a 500, and every
+--rate-limit-every'th request gets a 429, to exercise twint's retries.
+'''
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+
+from aiohttp import web
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+class Fixtures:
+    """Fixture pages, with their item ids renumbered for each page served
+    """
+    def __init__(self):
+        search = json.loads(_fixture("search.json"))
+        self.items = re.findall(r'<li class="js-stream-item.*?</li>\n', search["items_html"], re.S)
+        self.favorites = _fixture("mobile_favorites.html")
+        self.followers = _fixture("followers.html")
+        self.profile = _fixture("profile.html")
+
+    @staticmethod
+    def renumber(html, page):
+        # a different id range per page keeps tweets distinct across pages
+        return re.sub(r"1212(\d{15})", lambda m: str(1212000000000000000 - page * 10**12 + int(m.group(1))), html)
+
+    def timeline(self, page, last):
+        items = "" if last else self.renumber("".join(self.items), page)
+        return json.dumps({"min_position": f"cursor-{page + 1}", "has_more_items": not last,
+                           "items_html": items, "new_latent_count": 0})
+
+    def status(self, tweet_id):
+        item = self.items[0]
+        return re.sub(r"1212000000000000000", tweet_id, item)
+
+    def mobile(self, html, param, page, last):
+        if last:
+            html = re.sub(r'<table class="(tweet|user-item).*?</table>', "", html, flags=re.S)
+            return re.sub(r'<div class="w-button-more">.*?</div>', "", html, flags=re.S)
+        html = self.renumber(html, page)
+        html = re.sub(r"follower(\d+)", lambda m: f"follower{page}x{m.group(1)}", html)
+        return re.sub(rf"{param}=\d+", f"{param}={page + 1}", html)
+
+def make_app(pages=10, latency=0.0, error_rate=0.0, rate_limit_every=0, seed=None):
+    fixtures = Fixtures()
+    rng = random.Random(seed)
+    state = {"requests": 0}
+
+    def _page(value, prefix=""):
+        if not value or value == "-1":
+            return 0
+        value = value[len(prefix):] if value.startswith(prefix) else value
+        try:
+            return int(value)
+        except ValueError:
+            return pages
+
+    @web.middleware
+    async def conditions(request, handler):
+        state["requests"] += 1
+        if latency:
+            await asyncio.sleep(latency)
+        if rate_limit_every and state["requests"] % rate_limit_every == 0:
+            return web.Response(status=429, text="Rate limit exceeded")
+        if error_rate and rng.random() < error_rate:
+            return web.Response(status=500, text="Internal error")
+        return await handler(request)
+
+    async def search(request):
+        page = _page(request.query.get("max_position"), "cursor-")
+        return web.Response(text=fixtures.timeline(page, page >= pages), content_type="application/json")
+
+    async def profile_timeline(request):
+        # profile cursors are the last tweet id, each page has its own id range
+        position = request.query.get("max_position")
+        page = 0 if position is None else -((int(position) - 1212000000000000000) // 10**12) + 1
+        return web.Response(text=fixtures.timeline(page, page >= pages), content_type="application/json")
+
+    async def favorites(request):
+        page = _page(request.query.get("max_id"))
+        return web.Response(text=fixtures.mobile(fixtures.favorites, "max_id", page, page >= pages),
+                            content_type="text/html")
+
+    async def follows(request):
+        page = _page(request.query.get("cursor"))
+        return web.Response(text=fixtures.mobile(fixtures.followers, "cursor", page, page >= pages),
+                            content_type="text/html")
+
+    async def status(request):
+        tweet_id = request.match_info["id"]
+        return web.Response(text=fixtures.status(tweet_id), content_type="text/html")
+
+    async def user(request):
+        return web.Response(text=fixtures.profile, content_type="text/html")
+
+    async def intent(request):
+        return web.Response(text='<a class="fn url alternate-context" href="/user1000">User 1000</a>',
+                            content_type="text/html")
+
+    app = web.Application(middlewares=[conditions])
+    app["state"] = state
+    app.router.add_get("/i/search/timeline", search)
+    app.router.add_get("/i/profiles/show/{user}/timeline/tweets", profile_timeline)
+    app.router.add_get("/intent/user", intent)
+    app.router.add_get("/mobile/{user}", favorites)
+    app.router.add_get("/mobile/{user}/favorites", favorites)
+    app.router.add_get("/mobile/{user}/followers", follows)
+    app.router.add_get("/mobile/{user}/following", follows)
+    app.router.add_get("/{user}/status/{id}", status)
+    app.router.add_get("/{user}", user)
+    return app
+
+async def start(app, host="127.0.0.1", port=0):
+    """Start the app in the running loop, return (runner, base url)
+    """
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{port}"
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--pages", type=int, default=10, help="Pages served before a feed runs out.")
+    ap.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 500.")
+    ap.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with a 429.")
+    ap.add_argument("--seed", type=int)
+    args = ap.parse_args()
+    web.run_app(make_app(args.pages, args.latency, args.error_rate, args.rate_limit_every, args.seed),
+                host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+'''
+The bs4 and lxml backends must build identical tweets.
+
+    cd benchmarks && python -m pytest test_parsers.py --benchmark-disable
+'''
+from twint import extract, feed, tweet
+
+def test_lxml_matches_bs4(search_page, config):
+    config.Parser = "bs4"
+    expected = [tweet.Tweet(tw, config) for tw in feed.Json(search_page, "bs4")[0]]
+    config.Parser = "lxml"
+    actual = [extract.Tweet(tw, config) for tw in feed.Json(search_page, "lxml")[0]]
+
+    assert len(actual) == len(expected) == 20
+    differences = [(t.id, field, getattr(t, field, None), getattr(e, field, None))
+                   for t, e in zip(actual, expected) for field in tweet.tweet.__slots__
+                   if getattr(t, field, None) != getattr(e, field, None)]
+    assert differences == []
@@ -11,7 +11,7 @@ import logging, os
 
 from .config import Config
 from .__version__ import __version__
-from . import run
+from . import run, stream, trace
 
 _levels = {
     'info': logging.INFO,
@@ -30,3 +30,4 @@ if _level == "debug":
     fileHandler.setLevel(_logLevel)
     fileHandler.setFormatter(formatter)
     logger.addHandler(fileHandler)
+    trace.enable(log=True)
@@ -0,0 +1,136 @@
+'''
+checkpoint.py - Resume journal for long running scrapes.
+
+config.Resume names a SQLite file holding one row per query, keyed by a
+fingerprint of the options that define the query. Several queries, such
+as the windows of a sharded search, can share one file. Each page
+replaces the row in a single transaction, and resuming reads one row.
+'''
+from json import dumps
+import hashlib
+import os
+import sqlite3
+import time
+
+from . import trace
+
+# options that change which tweets or users a query returns
+_query_fields = ("Username", "User_id", "Search", "Query", "Since", "Until", "Year",
+                 "Lang", "Near", "Geo", "To", "All", "Email", "Phone", "Verified",
+                 "Images", "Videos", "Media", "Replies", "Links", "Source",
+                 "Members_list", "Min_likes", "Min_retweets", "Min_replies",
+                 "Native_retweets", "Filter_retweets", "Popular_tweets", "Custom_query",
+                 "TwitterSearch", "Profile", "Profile_full", "Favorites", "Followers",
+                 "Following", "User_full", "Retweets")
+
+_journals = {}
+
+def Derive(config, field, value):
+    """Set a query option twint works out itself, e.g. User_id from Username
+
+    The value the user gave is kept, so that a Config reused for the same
+    query keeps its fingerprint.
+    """
+    derived = dict(getattr(config, "_derived", {}))
+    current = getattr(config, field)
+    original = derived[field][0] if field in derived and derived[field][1] == current else current
+    derived[field] = (original, value)
+    config._derived = derived
+    setattr(config, field, value)
+
+def Fingerprint(config):
+    """Hash of the options that define a query, as the user gave them
+    """
+    derived = getattr(config, "_derived", {})
+    query = {}
+    for f in _query_fields:
+        value = getattr(config, f, None)
+        if f in derived and derived[f][1] == value:
+            value = derived[f][0]
+        query[f] = value
+    return hashlib.sha1(dumps(query, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def _legacy(path):
+    """Last cursor of a resume file from older versions, one cursor per line
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        block = b""
+        while end > 0 and block.rstrip(b"\n").count(b"\n") < 1:
+            start = max(end - 4096, 0)
+            f.seek(start)
+            block = f.read(end - start) + block
+            end = start
+    lines = block.rstrip(b"\n").split(b"\n")
+    return lines[-1].decode("utf-8").strip() if lines[-1] else None
+
+def _is_journal(path):
+    with open(path, "rb") as f:
+        return f.read(16) == b"SQLite format 3\x00"
+
+def _open(path):
+    conn = _journals.get(path)
+    if conn is not None:
+        return conn
+
+    cursor = None
+    if os.path.exists(path) and os.path.getsize(path) and not _is_journal(path):
+        trace.event(__name__, '_open:legacy')
+        cursor = _legacy(path)
+        os.replace(path, path + ".old")
+
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS
+            checkpoints (
+                fingerprint text not null,
+                cursor text not null,
+                count integer default 0,
+                done integer default 0,
+                time_update integer not null,
+                PRIMARY KEY (fingerprint)
+            );
+    """)
+    if cursor:
+        # the old file did not say which query it belonged to
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO checkpoints VALUES(?,?,?,?,?)",
+                         ("legacy", cursor, 0, 0, round(time.time()*1000)))
+    _journals[path] = conn
+    return conn
+
+def Load(path, fingerprint):
+    """Return (cursor, count, done) saved for a query, None if there is none
+
+    A cursor migrated from a legacy resume file is claimed by the first
+    query that loads one.
+    """
+    trace.event(__name__, 'Load')
+    conn = _open(path)
+    row = conn.execute("SELECT cursor, count, done FROM checkpoints WHERE fingerprint = ?",
+                       (fingerprint,)).fetchone()
+    if row is None:
+        row = conn.execute("SELECT cursor, count, done FROM checkpoints WHERE fingerprint = 'legacy'").fetchone()
+        if row is not None:
+            with conn:
+                conn.execute("UPDATE checkpoints SET fingerprint = ? WHERE fingerprint = 'legacy'",
+                             (fingerprint,))
+    if row is None:
+        return None
+    return row[0], row[1], bool(row[2])
+
+def Save(path, fingerprint, cursor, count, done=False):
+    trace.event(__name__, 'Save')
+    with _open(path) as conn:
+        conn.execute("INSERT OR REPLACE INTO checkpoints VALUES(?,?,?,?,?)",
+                     (fingerprint, str(cursor), count, int(done), round(time.time()*1000)))
+
+def close(path=None):
+    """Close the journal at path, or all of them
+    """
+    for _path in ([path] if path else list(_journals)):
+        conn = _journals.pop(_path, None)
+        if conn is not None:
+            conn.close()
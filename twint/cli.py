@@ -46,6 +46,8 @@ def check(args):
             error("Error", "Please specify an output file (Example: -o file.csv).")
         elif args.json:
             error("Error", "Please specify an output file (Example: -o file.json).")
+        elif args.parquet:
+            error("Error", "Please specify an output file (Example: -o file.parquet).")
 
 def loadUserList(ul, _type):
     """ Concatenate users
@@ -83,6 +85,8 @@ def initialize(args):
     c.Verified = args.verified
     c.Store_csv = args.csv
     c.Store_json = args.json
+    c.Store_parquet = args.parquet
+    c.Parquet_partition = args.parquet_partition
     c.Show_hashtags = args.hashtags
     c.Show_cashtags = args.cashtags
     c.Limit = args.limit
@@ -99,6 +103,8 @@ def initialize(args):
     c.Index_tweets = args.index_tweets
     c.Index_follow = args.index_follow
     c.Index_users = args.index_users
+    c.Elasticsearch_batch_size = args.es_batch_size
+    c.Geocode_cache = args.geocode_cache
     c.Debug = args.debug
     c.Resume = args.resume
     c.Images = args.images
@@ -124,6 +130,27 @@ def initialize(args):
     c.Filter_retweets = args.filter_retweets
     c.Translate = args.translate
     c.TranslateDest = args.translate_dest
+    c.Translate_cache = args.translate_cache
+    c.Base_url = args.base_url
+    c.Mobile_url = args.mobile_url
+    c.Connection_limit = args.connection_limit
+    c.Connection_limit_per_host = args.connection_limit_per_host
+    c.Multi_concurrency = args.multi_concurrency
+    c.Multi_ordered = not args.multi_unordered
+    c.Prefetch = args.prefetch
+    c.Shards = args.shards
+    c.Shard_days = args.shard_days
+    c.Shard_adaptive = args.shard_adaptive
+    c.Parser = args.parser
+    c.Parse_workers = args.parse_workers
+    c.Metrics_host = args.metrics_host
+    c.Metrics_port = args.metrics_port
+    c.Metrics_file = args.metrics_file
+    c.Profile_output = args.profile_output
+    c.Profiler = args.profiler
+    c.Profile_memory = args.profile_memory
+    c.Trace = args.trace
+    c.Trace_file = args.trace_file
     return c
 
 def options():
@@ -145,12 +172,21 @@ def options():
                     metavar="DATE")
     ap.add_argument("--until", help="Filter Tweets sent until date (Example: \"2017-12-27 20:30:15\" or 2017-12-27).",
                     metavar="DATE")
+    ap.add_argument("--shards", help="Split the search interval and scrape this many windows at once.",
+                    type=int, default=0)
+    ap.add_argument("--shard-days", help="Size of each search window in days (Use with --shards).",
+                    type=float)
+    ap.add_argument("--shard-adaptive",
+                    help="Split dense search windows further based on the Tweets collected so far (Use with --shards).",
+                    action="store_true")
     ap.add_argument("--email", help="Filter Tweets that might have email addresses", action="store_true")
     ap.add_argument("--phone", help="Filter Tweets that might have phone numbers", action="store_true")
     ap.add_argument("--verified", help="Display Tweets only from verified users (Use with -s).",
                     action="store_true")
     ap.add_argument("--csv", help="Write as .csv file.", action="store_true")
     ap.add_argument("--json", help="Write as .json file", action="store_true")
+    ap.add_argument("--parquet", help="Write as a .parquet dataset directory, one part file per run (requires pyarrow).", action="store_true")
+    ap.add_argument("--parquet-partition", help="Partition the .parquet output by date.", action="store_true")
     ap.add_argument("--hashtags", help="Output hashtags in seperate column.", action="store_true")
     ap.add_argument("--cashtags", help="Output cashtags in seperate column.", action="store_true")
     ap.add_argument("--userid", help="Twitter user id.")
@@ -168,6 +204,15 @@ def options():
     ap.add_argument("--proxy-type", help="Socks5, HTTP, etc.")
     ap.add_argument("--proxy-host", help="Proxy hostname or IP.")
     ap.add_argument("--proxy-port", help="The port of the proxy server.")
+    ap.add_argument("--base-url", help="Twitter web base URL, e.g. a local stand-in server.",
+                    default="https://twitter.com")
+    ap.add_argument("--mobile-url", help="Twitter mobile base URL, e.g. a local stand-in server.",
+                    default="https://mobile.twitter.com")
+    ap.add_argument("--connection-limit", help="Maximum number of pooled connections (0 for no limit).",
+                    type=int, default=100)
+    ap.add_argument("--connection-limit-per-host",
+                    help="Maximum number of pooled connections per host (0 for no limit).",
+                    type=int, default=0)
     ap.add_argument("--essid",
                     help="Elasticsearch Session ID, use this to differentiate scraping sessions.",
                     nargs="?", default="")
@@ -182,11 +227,22 @@ def options():
     ap.add_argument("--profile-full",
                     help="Slow, but effective method of collecting a user's Tweets and RT.",
                     action="store_true")
+    ap.add_argument("--multi-concurrency",
+                    help="Number of Tweets or users fetched at once with --user-full, --profile-full, --favorites or --location.",
+                    type=int, default=20)
+    ap.add_argument("--multi-unordered",
+                    help="Output fetched Tweets or users as soon as they arrive instead of in feed order.",
+                    action="store_true")
+    ap.add_argument("--prefetch",
+                    help="Number of feed pages fetched ahead while earlier ones are processed.",
+                    type=int, default=2)
     ap.add_argument("--translate",
                     help="Get tweets translated by Google Translate.",
                     action="store_true")
     ap.add_argument("--translate-dest", help="Translate tweet to language (ISO2).",
                     default="en")
+    ap.add_argument("--translate-cache",
+                    help="SQLite file to cache translations in across runs.")
     ap.add_argument("--store-pandas", help="Save Tweets in a DataFrame (Pandas) file.")
     ap.add_argument("--pandas-type",
                     help="Specify HDF5 or Pickle (HDF5 as default)", nargs="?", default="HDF5")
@@ -197,9 +253,33 @@ def options():
                     nargs="?", default="twintgraph")
     ap.add_argument("-iu", "--index-users", help="Custom Elasticsearch Index name for Users.",
                     nargs="?", default="twintuser")
+    ap.add_argument("--parser", help="HTML parser backend for Tweets: bs4 or lxml (faster).",
+                    choices=["bs4", "lxml"], default="bs4")
+    ap.add_argument("--parse-workers", help="Parse search and profile pages in this many worker processes.",
+                    type=int, default=0)
+    ap.add_argument("--metrics-host", help="Address the metrics endpoint listens on (default: 127.0.0.1).",
+                    default="127.0.0.1")
+    ap.add_argument("--metrics-port", help="Serve Prometheus metrics on this port while scraping.",
+                    type=int)
+    ap.add_argument("--metrics-file", help="Write a JSON metrics snapshot to this file periodically.",
+                    metavar="FILE")
+    ap.add_argument("--profile-output", help="Profile the run and write the profile to this file.",
+                    metavar="FILE")
+    ap.add_argument("--profiler", help="cprofile (pstats output) or sampling (collapsed stacks for flame graphs).",
+                    choices=["cprofile", "sampling"], default="cprofile")
+    ap.add_argument("--profile-memory", help="Also write the allocations that grew most during the run.",
+                    action="store_true")
+    ap.add_argument("--trace", help="Record recent internal events and write them out if the run fails.",
+                    action="store_true")
+    ap.add_argument("--trace-file", help="File the recorded events are written to (default: twint-trace.log).",
+                    metavar="FILE", default="twint-trace.log")
+    ap.add_argument("--es-batch-size", help="Number of documents sent to Elasticsearch per bulk request.",
+                    type=int, default=1000)
+    ap.add_argument("--geocode-cache", help="SQLite file used to cache geocoded places between runs.",
+                    metavar="FILE")
     ap.add_argument("--debug",
                     help="Store information in debug logs", action="store_true")
-    ap.add_argument("--resume", help="Resume from Tweet ID.", metavar="TWEET_ID")
+    ap.add_argument("--resume", help="Checkpoint file to resume from and save progress to.", metavar="FILE")
     ap.add_argument("--videos", help="Display only Tweets with videos.", action="store_true")
     ap.add_argument("--images", help="Display only Tweets with images.", action="store_true")
     ap.add_argument("--media",
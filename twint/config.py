@@ -16,6 +16,10 @@ class Config:
     Verified = False
     Store_csv = False
     Store_json = False
+    Output_flush_interval = 1
+    Store_parquet = False
+    Parquet_row_group = 10000
+    Parquet_partition = False
     Custom = {"tweet": None, "user": None, "username": None}
     Show_hashtags = False
     Show_cashtags = False
@@ -23,6 +27,8 @@ class Config:
     Count = None
     Stats = False
     Database = None
+    Database_batch_size = 500
+    Database_flush_interval = 5
     To = None
     All = None
     Debug = False
@@ -39,12 +45,48 @@ class Config:
     Store_object_tweets_list = None
     Store_object_users_list = None
     Store_object_follow_list = None
+    Store_object_limit = None
+    Stream_queue = None
+    Stream_buffer = 100
     Pandas_type = None
     Pandas = False
     Index_tweets = "twinttweets"
     Index_follow = "twintgraph"
     Index_users = "twintuser"
+    Elasticsearch_batch_size = 1000
+    Elasticsearch_flush_interval = 5
+    Elasticsearch_threads = 4
+    Geocode_cache = None
+    Geocode_cache_size = 10000
+    Geocode_delay = 1
+    Geocode_timeout = 10
     Retries_count = 10
+    Base_url = "https://twitter.com"
+    Mobile_url = "https://mobile.twitter.com"
+    Connection_limit = 100
+    Connection_limit_per_host = 0
+    Keepalive_timeout = 30
+    Dns_cache_ttl = 300
+    Multi_concurrency = 20
+    Multi_ordered = True
+    Prefetch = 2
+    Shards = 0
+    Shard_days = None
+    Shard_adaptive = False
+    Shard_tweets = 5000
+    Parser = "bs4"
+    Parse_workers = 0
+    Metrics_host = "127.0.0.1"
+    Metrics_port = None
+    Metrics_file = None
+    Metrics_interval = 10
+    Profile_output = None
+    Profiler = "cprofile"
+    Profile_interval = 0.005
+    Profile_memory = False
+    Trace = False
+    Trace_file = "twint-trace.log"
+    Trace_buffer = 10000
     Resume = None
     Images = False
     Videos = False
@@ -75,3 +117,8 @@ class Config:
     Translate = False
     TranslateSrc = "en"
     TranslateDest = "en"
+    Translator = None
+    Translate_batch_size = 20
+    Translate_concurrency = 4
+    Translate_cache = None
+    Translate_cache_size = 10000
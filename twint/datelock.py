@@ -1,6 +1,6 @@
 import datetime
 
-import logging as logme
+from . import trace
 
 
 class Datelock:
@@ -21,7 +21,7 @@ def convertToDateTime(string):
 
 
 def Set(Until, Since):
-    logme.debug(__name__+':Set')
+    trace.event(__name__, 'Set')
     d = Datelock()
 
     if Until:
@@ -37,3 +37,21 @@ def Set(Until, Since):
         d._since_def_user = False
 
     return d
+
+
+def Windows(since, until, count=1, days=None):
+    trace.event(__name__, 'Windows')
+    if days:
+        step = datetime.timedelta(days=days)
+    else:
+        step = (until - since) / max(int(count), 1)
+    step = max(step, datetime.timedelta(seconds=1))
+
+    windows = []
+    end = until.replace(microsecond=0)
+    while end > since:
+        start = max(end - step, since).replace(microsecond=0)
+        windows.append((start, end))
+        end = start
+
+    return windows
@@ -0,0 +1,123 @@
+from lxml import etree, html as lxml_html
+
+from . import trace
+from .tweet import tweet, _attributes, _derived
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+_tweets = etree.XPath(f"//div[{_has_class('tweet')}]")
+_withheld = etree.XPath(f".//div[{_has_class('StreamItemContent--withheld')}]")
+_permalink = etree.XPath(f".//a[{_has_class('tweet-timestamp')}][{_has_class('js-permalink')}]/@href")
+_stat_count = etree.XPath("(.//span)[1]/@data-tweet-stat-count")
+
+_stats = {
+    "ProfileTweet-action--reply": "replies_count",
+    "ProfileTweet-action--retweet": "retweets_count",
+    "ProfileTweet-action--favorite": "likes_count",
+}
+
+def Feed(html):
+    """Extract tweet elements from an HTML page or fragment
+    """
+    trace.event(__name__, 'Feed')
+    if not html.strip():
+        return []
+    return _tweets(lxml_html.fromstring(html))
+
+def Withheld(tw):
+    """Return the withheld notice of a tweet, if any
+    """
+    withheld = _withheld(tw)
+    return withheld[0] if withheld else None
+
+def Permalink(tw):
+    """Get the status path of a tweet
+    """
+    return _permalink(tw)[0]
+
+def _is_emoji(el):
+    return el.tag == "img" and "Emoji--forText" in (el.get("class") or "").split()
+
+def getText(el):
+    """Text content of an element with emoji images replaced by their alt text
+    """
+    parts = []
+    for event, node in etree.iterwalk(el, events=("start", "end")):
+        if event == "start":
+            if _is_emoji(node):
+                parts.append(node.get("alt", ""))
+            elif isinstance(node.tag, str) and node.text:
+                parts.append(node.text)
+        elif node is not el and node.tail:
+            parts.append(node.tail)
+    return "".join(parts)
+
+def Tweet(tw, config):
+    """Create Tweet object in a single walk over the tweet element
+    """
+    trace.event(__name__, 'Tweet')
+    t = tweet()
+    _attributes(t, tw)
+    t.datetime = None
+    t.place = None
+    t.urls = []
+    t.photos = []
+    t.video = 0
+    t.tweet = None
+    t.hashtags = []
+    t.cashtags = []
+    t.replies_count = None
+    t.retweets_count = None
+    t.likes_count = None
+    t.user_rt_id, t.user_rt = '', ''
+    t.quote_url = None
+    retweet_text = None
+
+    for el in tw.iter(etree.Element):
+        _class = el.get("class")
+        if not _class:
+            continue
+        classes = _class.split()
+        tag = el.tag
+        if tag == "span":
+            if t.datetime is None and "_timestamp" in classes:
+                t.datetime = int(el.get("data-time-ms"))
+            elif retweet_text is None and "js-retweet-text" in classes:
+                retweet_text = el
+            elif "u-hiddenVisually" in classes:
+                for _stat in classes:
+                    field = _stats.get(_stat)
+                    if field and getattr(t, field) is None:
+                        setattr(t, field, int(_stat_count(el)[0]))
+        elif tag == "a":
+            if "twitter-timeline-link" in classes and el.get("data-expanded-url") is not None:
+                t.urls.append(el.get("data-expanded-url"))
+            if "twitter-hashtag" in classes:
+                t.hashtags.append(getText(el))
+            if "twitter-cashtag" in classes:
+                t.cashtags.append(getText(el))
+            if t.place is None and "js-geo-pivot-link" in classes:
+                t.place = getText(el).strip()
+        elif tag == "div":
+            if "AdaptiveMedia-photoContainer" in classes:
+                t.photos.append(el.get("data-image-url"))
+            if "AdaptiveMedia-video" in classes:
+                t.video = 1
+            if t.quote_url is None and "QuoteTweet-innerContainer" in classes:
+                t.quote_url = "https://twitter.com" + el.get("href") if el.get("href") else ""
+        elif tag == "p" and t.tweet is None and "tweet-text" in classes:
+            text = getText(el)
+            text = text.replace("http", " http")
+            t.tweet = text.replace("pic.twitter", " pic.twitter")
+
+    if config.Profile:
+        if t.user_id != config.User_id:
+            t.user_rt_id, t.user_rt = config.User_id, config.Username
+    elif retweet_text is not None:
+        _rt_link = retweet_text.find(".//a")
+        t.user_rt_id, t.user_rt = _rt_link.get("data-user-id"), _rt_link.get("href")[1:]
+    t.place = t.place or ""
+    t.quote_url = t.quote_url or ""
+    _derived(t, tw, config)
+    return t
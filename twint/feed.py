@@ -2,10 +2,18 @@ from bs4 import BeautifulSoup
 from re import findall
 from json import loads
 
+from . import extract, trace
+
 import logging as logme
 
+def _tweets(html, parser):
+    if parser == "lxml":
+        return extract.Feed(html)
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.find_all("div", "tweet")
+
 def Follow(response):
-    logme.debug(__name__+':Follow')
+    trace.event(__name__, 'Follow')
     soup = BeautifulSoup(response, "html.parser")
     follow = soup.find_all("td", "info fifty screenname")
     cursor = soup.find_all("div", "w-button-more")
@@ -17,7 +25,7 @@ def Follow(response):
     return follow, cursor
 
 def Mobile(response):
-    logme.debug(__name__+':Mobile')
+    trace.event(__name__, 'Mobile')
     soup = BeautifulSoup(response, "html.parser")
     tweets = soup.find_all("span", "metadata")
     max_id = soup.find_all("div", "w-button-more")
@@ -28,19 +36,17 @@ def Mobile(response):
 
     return tweets, max_id
 
-def profile(response):
-    logme.debug(__name__+':profile')
+def profile(response, parser="bs4"):
+    trace.event(__name__, 'profile')
     json_response = loads(response)
     html = json_response["items_html"]
-    soup = BeautifulSoup(html, "html.parser")
-    feed = soup.find_all("div", "tweet")
+    feed = _tweets(html, parser)
 
-    return feed, feed[-1]["data-item-id"]
+    return feed, feed[-1].get("data-item-id")
 
-def Json(response):
-    logme.debug(__name__+':Json')
+def Json(response, parser="bs4"):
+    trace.event(__name__, 'Json')
     json_response = loads(response)
     html = json_response["items_html"]
-    soup = BeautifulSoup(html, "html.parser")
-    feed = soup.find_all("div", "tweet")
+    feed = _tweets(html, parser)
     return feed, json_response["min_position"]
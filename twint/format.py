@@ -1,38 +1,96 @@
-import logging as logme
+from functools import lru_cache
+import re
+
+from . import trace
+
+_placeholder = re.compile(r"\{(\w+)\}")
+
+_tweet_fields = {
+    "id": lambda t: t.id_str,
+    "conversation_id": lambda t: t.conversation_id,
+    "date": lambda t: t.datestamp,
+    "time": lambda t: t.timestamp,
+    "user_id": lambda t: t.user_id_str,
+    "username": lambda t: t.username,
+    "name": lambda t: t.name,
+    "place": lambda t: t.place,
+    "timezone": lambda t: t.timezone,
+    "urls": lambda t: ",".join(t.urls),
+    "photos": lambda t: ",".join(t.photos),
+    "video": lambda t: t.video,
+    "tweet": lambda t: t.tweet,
+    "hashtags": lambda t: ",".join(t.hashtags),
+    "cashtags": lambda t: ",".join(t.cashtags),
+    "replies": lambda t: t.replies_count,
+    "retweets": lambda t: t.retweets_count,
+    "likes": lambda t: t.likes_count,
+    "link": lambda t: t.link,
+    "is_retweet": lambda t: t.retweet,
+    "user_rt_id": lambda t: t.user_rt_id,
+    "quote_url": lambda t: t.quote_url,
+    "near": lambda t: t.near,
+    "geo": lambda t: t.geo,
+    "mentions": lambda t: ",".join(t.mentions),
+    "translate": lambda t: t.translate,
+    "trans_src": lambda t: t.trans_src,
+    "trans_dest": lambda t: t.trans_dest,
+}
+
+_user_fields = {
+    "id": lambda u: u.id,
+    "name": lambda u: u.name,
+    "username": lambda u: u.username,
+    "bio": lambda u: u.bio,
+    "location": lambda u: u.location,
+    "url": lambda u: u.url,
+    "join_date": lambda u: u.join_date,
+    "join_time": lambda u: u.join_time,
+    "tweets": lambda u: u.tweets,
+    "following": lambda u: u.following,
+    "followers": lambda u: u.followers,
+    "likes": lambda u: u.likes,
+    "media": lambda u: u.media_count,
+    "private": lambda u: u.is_private,
+    "verified": lambda u: u.is_verified,
+    "avatar": lambda u: u.avatar,
+    "background_image": lambda u: u.background_image or "",
+}
+
+_fields = {
+    "tweet": _tweet_fields,
+    "user": _user_fields,
+}
+
+@lru_cache(maxsize=32)
+def _compile(_format, _type):
+    """Split a format string into a str.format template and the getters
+    of its placeholders, unknown placeholders are kept as they are
+    """
+    fields = _fields[_type]
+    template = []
+    getters = []
+    pos = 0
+    for match in _placeholder.finditer(_format):
+        getter = fields.get(match.group(1))
+        if getter is None:
+            continue
+        template.append(_format[pos:match.start()].replace("{", "{{").replace("}", "}}"))
+        template.append("{}")
+        getters.append(getter)
+        pos = match.end()
+    template.append(_format[pos:].replace("{", "{{").replace("}", "}}"))
+    return "".join(template), tuple(getters)
+
+def _render(_format, _type, obj):
+    template, getters = _compile(_format, _type)
+    return template.format(*[getter(obj) for getter in getters])
 
 def Tweet(config, t):
     if config.Format:
-        logme.debug(__name__+':Tweet:Format')
-        output = config.Format.replace("{id}", t.id_str)
-        output = output.replace("{conversation_id}", t.conversation_id)
-        output = output.replace("{date}", t.datestamp)
-        output = output.replace("{time}", t.timestamp)
-        output = output.replace("{user_id}", t.user_id_str)
-        output = output.replace("{username}", t.username)
-        output = output.replace("{name}", t.name)
-        output = output.replace("{place}", t.place)
-        output = output.replace("{timezone}", t.timezone)
-        output = output.replace("{urls}", ",".join(t.urls))
-        output = output.replace("{photos}", ",".join(t.photos))
-        output = output.replace("{video}", str(t.video))
-        output = output.replace("{tweet}", t.tweet)
-        output = output.replace("{hashtags}", ",".join(t.hashtags))
-        output = output.replace("{cashtags}", ",".join(t.cashtags))
-        output = output.replace("{replies}", t.replies_count)
-        output = output.replace("{retweets}", t.retweets_count)
-        output = output.replace("{likes}", t.likes_count)
-        output = output.replace("{link}", t.link)
-        output = output.replace("{is_retweet}", str(t.retweet))
-        output = output.replace("{user_rt_id}", str(t.user_rt_id))
-        output = output.replace("{quote_url}", t.quote_url)
-        output = output.replace("{near}", t.near)
-        output = output.replace("{geo}", t.geo)
-        output = output.replace("{mentions}", ",".join(t.mentions))
-        output = output.replace("{translate}", t.translate)
-        output = output.replace("{trans_src}", t.trans_src)
-        output = output.replace("{trans_dest}", t.trans_dest)
+        trace.event(__name__, 'Tweet:Format')
+        output = _render(config.Format, "tweet", t)
     else:
-        logme.debug(__name__+':Tweet:notFormat')
+        trace.event(__name__, 'Tweet:notFormat')
         output = f"{t.id_str} {t.datestamp} {t.timestamp} {t.timezone} "
 
         if t.retweet:
@@ -54,29 +112,10 @@ def Tweet(config, t):
 
 def User(_format, u):
     if _format:
-        logme.debug(__name__+':User:Format')
-        output = _format.replace("{id}", str(u.id))
-        output = output.replace("{name}", u.name)
-        output = output.replace("{username}", u.username)
-        output = output.replace("{bio}", u.bio)
-        output = output.replace("{location}", u.location)
-        output = output.replace("{url}", u.url)
-        output = output.replace("{join_date}", u.join_date)
-        output = output.replace("{join_time}", u.join_time)
-        output = output.replace("{tweets}", str(u.tweets))
-        output = output.replace("{following}", str(u.following))
-        output = output.replace("{followers}", str(u.followers))
-        output = output.replace("{likes}", str(u.likes))
-        output = output.replace("{media}", str(u.media_count))
-        output = output.replace("{private}", str(u.is_private))
-        output = output.replace("{verified}", str(u.is_verified))
-        output = output.replace("{avatar}", u.avatar)
-        if u.background_image:
-            output = output.replace("{background_image}", u.background_image)
-        else:
-            output = output.replace("{background_image}", "")
+        trace.event(__name__, 'User:Format')
+        output = _render(_format, "user", u)
     else:
-        logme.debug(__name__+':User:notFormat')
+        trace.event(__name__, 'User:notFormat')
         output = f"{u.id} | {u.name} | @{u.username} | Private: "
         output += f"{u.is_private} | Verified: {u.is_verified} |"
         output += f" Bio: {u.bio} | Location: {u.location} | Url: "
@@ -6,12 +6,11 @@ import socket
 import aiohttp
 from fake_useragent import UserAgent
 import asyncio
-import concurrent.futures
 import random
 from json import loads
 from aiohttp_socks import SocksConnector, SocksVer
 
-from . import url
+from . import url, extract, metrics, trace, feed as _feed
 from .output import Tweets, Users
 from .user import inf
 
@@ -45,8 +44,16 @@ user_agent_list = [
     'Mozilla/4.0 (compatible; MSIE 8.0; Windows NT 5.1; Trident/4.0; .NET CLR 2.0.50727; .NET CLR 3.0.4506.2152; .NET CLR 3.5.30729)'
 ]
 
+def _pool_options(config):
+    return {
+        "limit": config.Connection_limit,
+        "limit_per_host": config.Connection_limit_per_host,
+        "keepalive_timeout": config.Keepalive_timeout,
+        "ttl_dns_cache": config.Dns_cache_ttl,
+    }
+
 def get_connector(config):
-    logme.debug(__name__+':get_connector')
+    trace.event(__name__, 'get_connector')
     _connector = None
     if config.Proxy_host:
         if config.Proxy_host.lower() == "tor":
@@ -54,7 +61,8 @@ def get_connector(config):
                 socks_ver=SocksVer.SOCKS5,
                 host='127.0.0.1',
                 port=9050,
-                rdns=True)
+                rdns=True,
+                **_pool_options(config))
         elif config.Proxy_port and config.Proxy_type:
             if config.Proxy_type.lower() == "socks5":
                 _type = SocksVer.SOCKS5
@@ -63,7 +71,7 @@ def get_connector(config):
             elif config.Proxy_type.lower() == "http":
                 global httpproxy
                 httpproxy = "http://" + config.Proxy_host + ":" + str(config.Proxy_port)
-                return _connector
+                return aiohttp.TCPConnector(**_pool_options(config))
             else:
                 logme.critical("get_connector:proxy-type-error")
                 print("Error: Proxy types allowed are: http, socks5 and socks4. No https.")
@@ -72,7 +80,8 @@ def get_connector(config):
                 socks_ver=_type,
                 host=config.Proxy_host,
                 port=config.Proxy_port,
-                rdns=True)
+                rdns=True,
+                **_pool_options(config))
         else:
             logme.critical(__name__+':get_connector:proxy-port-type-error')
             print("Error: Please specify --proxy-host, --proxy-port, and --proxy-type")
@@ -82,41 +91,52 @@ def get_connector(config):
             logme.critical(__name__+':get_connector:proxy-host-arg-error')
             print("Error: Please specify --proxy-host, --proxy-port, and --proxy-type")
             sys.exit(1)
+        _connector = aiohttp.TCPConnector(**_pool_options(config))
 
     return _connector
 
+def Session(config):
+    """Pooled session shared by all requests of a run
+    """
+    trace.event(__name__, 'Session')
+    return aiohttp.ClientSession(connector=get_connector(config))
 
-async def RequestUrl(config, init, headers = []):
-    logme.debug(__name__+':RequestUrl')
-    _connector = get_connector(config)
+async def RequestUrl(config, init, headers = [], session=None):
+    trace.event(__name__, 'RequestUrl')
     _serialQuery = ""
     params = []
     _url = ""
 
     if config.Profile:
         if config.Profile_full:
-            logme.debug(__name__+':RequestUrl:Profile_full')
-            _url = await url.MobileProfile(config.Username, init)
+            trace.event(__name__, 'RequestUrl:Profile_full')
+            _url = await url.MobileProfile(config.Username, init, config)
         else:
-            logme.debug(__name__+':RequestUrl:notProfile_full')
-            _url = await url.Profile(config.Username, init)
+            trace.event(__name__, 'RequestUrl:notProfile_full')
+            _url = await url.Profile(config.Username, init, config)
         _serialQuery = _url
     elif config.TwitterSearch:
-        logme.debug(__name__+':RequestUrl:TwitterSearch')
+        trace.event(__name__, 'RequestUrl:TwitterSearch')
         _url, params, _serialQuery = await url.Search(config, init)
     else:
         if config.Following:
-            logme.debug(__name__+':RequestUrl:Following')
-            _url = await url.Following(config.Username, init)
+            trace.event(__name__, 'RequestUrl:Following')
+            _url = await url.Following(config.Username, init, config)
         elif config.Followers:
-            logme.debug(__name__+':RequestUrl:Followers')
-            _url = await url.Followers(config.Username, init)
+            trace.event(__name__, 'RequestUrl:Followers')
+            _url = await url.Followers(config.Username, init, config)
         else:
-            logme.debug(__name__+':RequestUrl:Favorites')
-            _url = await url.Favorites(config.Username, init)
+            trace.event(__name__, 'RequestUrl:Favorites')
+            _url = await url.Favorites(config.Username, init, config)
         _serialQuery = _url
 
-    response = await Request(_url, params=params, connector=_connector, headers=headers)
+    with metrics.timer("twint_fetch_seconds"), trace.span(__name__, 'RequestUrl:fetch'):
+        if session is None:
+            response = await Request(_url, params=params, connector=get_connector(config), headers=headers)
+        else:
+            response = await Request(_url, params=params, headers=headers, session=session)
+    if metrics.enabled:
+        metrics.count("twint_fetch_bytes_total", len(response.encode("utf-8")))
 
     if config.Debug:
         print(_serialQuery, file=open("twint-request_urls.log", "a", encoding="utf-8"))
@@ -124,7 +144,7 @@ async def RequestUrl(config, init, headers = []):
     return response
 
 def ForceNewTorIdentity(config):
-    logme.debug(__name__+':ForceNewTorIdentity')
+    trace.event(__name__, 'ForceNewTorIdentity')
     try:
         tor_c = socket.create_connection(('127.0.0.1', config.Tor_control_port))
         tor_c.send('AUTHENTICATE "{}"\r\nSIGNAL NEWNYM\r\n'.format(config.Tor_control_password).encode())
@@ -133,23 +153,26 @@ def ForceNewTorIdentity(config):
             sys.stderr.write('Unexpected response from Tor control port: {}\n'.format(response))
             logme.critical(__name__+':ForceNewTorIdentity:unexpectedResponse')
     except Exception as e:
-        logme.debug(__name__+':ForceNewTorIdentity:errorConnectingTor')
+        trace.event(__name__, 'ForceNewTorIdentity:errorConnectingTor')
         sys.stderr.write('Error connecting to Tor control port: {}\n'.format(repr(e)))
         sys.stderr.write('If you want to rotate Tor ports automatically - enable Tor control port\n')
 
-async def Request(url, connector=None, params=[], headers=[]):
-    logme.debug(__name__+':Request:Connector')
+async def Request(url, connector=None, params=[], headers=[], session=None):
+    if session is not None:
+        trace.event(__name__, 'Request:Session')
+        return await Response(session, url, params, headers)
+    trace.event(__name__, 'Request:Connector')
     async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
         return await Response(session, url, params)
 
-async def Response(session, url, params=[]):
-    logme.debug(__name__+':Response')
+async def Response(session, url, params=[], headers=None):
+    trace.event(__name__, 'Response')
     with timeout(120):
-        async with session.get(url, ssl=True, params=params, proxy=httpproxy) as response:
+        async with session.get(url, ssl=True, params=params, headers=headers, proxy=httpproxy) as response:
             return await response.text()
 
 async def RandomUserAgent(wa=None):
-    logme.debug(__name__+':RandomUserAgent')
+    trace.event(__name__, 'RandomUserAgent')
     try:
         if wa:
             return "Mozilla/5.0 (Windows NT 6.4; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/41.0.2225.0 Safari/537.36"
@@ -157,79 +180,114 @@ async def RandomUserAgent(wa=None):
     except:
         return random.choice(user_agent_list)
 
-async def Username(_id):
-    logme.debug(__name__+':Username')
-    url = f"https://twitter.com/intent/user?user_id={_id}&lang=en"
-    r = await Request(url)
+async def Username(_id, session=None, base_url="https://twitter.com"):
+    trace.event(__name__, 'Username')
+    url = f"{base_url}/intent/user?user_id={_id}&lang=en"
+    r = await Request(url, session=session)
     soup = BeautifulSoup(r, "html.parser")
 
     return soup.find("a", "fn url alternate-context")["href"].replace("/", "")
 
-async def Tweet(url, config, conn):
-    logme.debug(__name__+':Tweet')
+async def _tweet(response, url, config, conn):
+    tweets = _feed._tweets(response, config.Parser)
+    await Tweets(tweets, config, conn, url)
+
+async def _user(response, config, conn):
+    soup = BeautifulSoup(response, "html.parser")
+    await Users(soup, config, conn)
+
+async def Tweet(url, config, conn, session=None):
+    trace.event(__name__, 'Tweet')
     try:
-        response = await Request(url)
-        soup = BeautifulSoup(response, "html.parser")
-        tweets = soup.find_all("div", "tweet")
-        await Tweets(tweets, config, conn, url)
+        response = await Request(url, session=session)
+        await _tweet(response, url, config, conn)
     except Exception as e:
         logme.critical(__name__+':Tweet:' + str(e))
 
-async def User(url, config, conn, user_id = False):
-    logme.debug(__name__+':User')
-    _connector = get_connector(config)
+async def User(url, config, conn, user_id = False, session=None):
+    trace.event(__name__, 'User')
     try:
-        response = await Request(url, connector=_connector)
-        soup = BeautifulSoup(response, "html.parser")
+        if session is None:
+            response = await Request(url, connector=get_connector(config))
+        else:
+            response = await Request(url, session=session)
         if user_id:
+            soup = BeautifulSoup(response, "html.parser")
             return int(inf(soup, "id"))
-        await Users(soup, config, conn)
+        await _user(response, config, conn)
     except Exception as e:
         logme.critical(__name__+':User:' + str(e))
 
 def Limit(Limit, count):
-    logme.debug(__name__+':Limit')
+    trace.event(__name__, 'Limit')
     if Limit is not None and count >= int(Limit):
         return True
 
-async def Multi(feed, config, conn):
-    logme.debug(__name__+':Multi')
+def MultiUrl(tweet, config):
+    trace.event(__name__, 'MultiUrl')
+    if config.Favorites or config.Profile_full:
+        trace.event(__name__, 'MultiUrl:Favorites-profileFull')
+        link = tweet.find("a")["href"]
+        return f"{config.Base_url}{link}&lang=en"
+    elif config.User_full:
+        trace.event(__name__, 'MultiUrl:userFull')
+        username = tweet.find("a")["name"]
+        return f"{config.Base_url}/{username}?lang=en"
+    else:
+        trace.event(__name__, 'MultiUrl:else-url')
+        if config.Parser == "lxml":
+            link = extract.Permalink(tweet)
+        else:
+            link = tweet.find("a", "tweet-timestamp js-permalink js-nav js-tooltip")["href"]
+        return f"{config.Base_url}{link}?lang=en"
+
+async def _fetch(url, config, semaphore, session):
+    async with semaphore:
+        try:
+            if session is None:
+                response = await Request(url, connector=get_connector(config))
+            else:
+                response = await Request(url, session=session)
+            return url, response, None
+        except Exception as e:
+            return url, None, e
+
+async def Multi(feed, config, conn, session=None):
+    trace.event(__name__, 'Multi')
     count = 0
-    try:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-            loop = asyncio.get_event_loop()
-            futures = []
-            for tweet in feed:
-                count += 1
-                if config.Favorites or config.Profile_full:
-                    logme.debug(__name__+':Multi:Favorites-profileFull')
-                    link = tweet.find("a")["href"]
-                    url = f"https://twitter.com{link}&lang=en"
-                elif config.User_full:
-                    logme.debug(__name__+':Multi:userFull')
-                    username = tweet.find("a")["name"]
-                    url = f"http://twitter.com/{username}?lang=en"
-                else:
-                    logme.debug(__name__+':Multi:else-url')
-                    link = tweet.find("a", "tweet-timestamp js-permalink js-nav js-tooltip")["href"]
-                    url = f"https://twitter.com{link}?lang=en"
+    urls = []
+    for tweet in feed:
+        count += 1
+        try:
+            urls.append(MultiUrl(tweet, config))
+        except Exception as e:
+            logme.critical(__name__+':Multi:url:' + str(e))
 
+    semaphore = asyncio.Semaphore(config.Multi_concurrency)
+    futures = [asyncio.ensure_future(_fetch(url, config, semaphore, session)) for url in urls]
+    try:
+        if config.Multi_ordered:
+            trace.event(__name__, 'Multi:ordered')
+            results = futures
+        else:
+            trace.event(__name__, 'Multi:unordered')
+            results = asyncio.as_completed(futures)
+        for result in results:
+            url, response, error = await result
+            if error is not None:
+                logme.critical(__name__+':Multi:fetch:' + str(error))
+                continue
+            try:
                 if config.User_full:
-                    logme.debug(__name__+':Multi:user-full-Run')
-                    futures.append(loop.run_in_executor(executor, await User(url,
-                        config, conn)))
+                    trace.event(__name__, 'Multi:user-full-Run')
+                    await _user(response, config, conn)
                 else:
-                    logme.debug(__name__+':Multi:notUser-full-Run')
-                    futures.append(loop.run_in_executor(executor, await Tweet(url,
-                        config, conn)))
-            logme.debug(__name__+':Multi:asyncioGather')
-            await asyncio.gather(*futures)
-    except Exception as e:
-        # TODO: fix error not error
-        # print(str(e) + " [x] get.Multi")
-        # will return "'NoneType' object is not callable"
-        # but still works
-        # logme.critical(__name__+':Multi:' + str(e))
-        pass
+                    trace.event(__name__, 'Multi:notUser-full-Run')
+                    await _tweet(response, url, config, conn)
+            except Exception as e:
+                logme.critical(__name__+':Multi:' + str(e))
+    finally:
+        for future in futures:
+            future.cancel()
 
     return count
@@ -0,0 +1,239 @@
+'''
+metrics.py - Counters and latency histograms for the stages of a scrape.
+
+Enabled by config.Metrics_port, which serves the Prometheus text format
+on http://<Metrics_host>:<port>/metrics while the scrape runs, and/or by
+config.Metrics_file, which gets a JSON snapshot every
+config.Metrics_interval seconds and at the end of the run.
+
+    twint_fetch_seconds       histogram   feed page requests
+    twint_fetch_bytes_total   counter     bytes of feed pages received
+    twint_retries_total       counter     feed pages retried
+    twint_parse_seconds       histogram   by stage: feed, tweet
+    twint_sink_seconds        histogram   by sink: database, pandas, write,
+                                          terminal, ...
+    twint_tweets_total        counter     tweets output
+    twint_users_total         counter     users and usernames output
+'''
+from asyncio import ensure_future, sleep, CancelledError
+from json import dump
+import os
+import time
+
+from . import trace
+
+
+# checked before recording anything, so disabled metrics cost one lookup
+enabled = False
+
+_buckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_help = {
+    "twint_fetch_seconds": "Time spent requesting feed pages.",
+    "twint_fetch_bytes_total": "Bytes of feed pages received.",
+    "twint_retries_total": "Feed pages retried after an error.",
+    "twint_parse_seconds": "Time spent parsing, by stage.",
+    "twint_sink_seconds": "Time spent writing to each output, by sink.",
+    "twint_tweets_total": "Tweets output.",
+    "twint_users_total": "Users and usernames output.",
+}
+
+_counters = {}
+_histograms = {}
+_started = None
+_users = 0
+_runner = None
+_writer = None
+_file = None
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(_buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(_buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+def count(name, value=1, label=None):
+    if not enabled:
+        return
+    key = (name, label)
+    _counters[key] = _counters.get(key, 0) + value
+
+def observe(name, seconds, label=None):
+    if not enabled:
+        return
+    key = (name, label)
+    histogram = _histograms.get(key)
+    if histogram is None:
+        histogram = _histograms[key] = _Histogram()
+    histogram.observe(seconds)
+
+class _Timer:
+    __slots__ = ("name", "label", "start")
+
+    def __init__(self, name, label):
+        self.name = name
+        self.label = label
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start, self.label)
+        return False
+
+def timer(name, label=None):
+    """Observe the time spent in the block, when metrics are enabled
+    """
+    if enabled:
+        return _Timer(name, label)
+    return trace._noop
+
+def _labels(name, label):
+    if label is None:
+        return ""
+    key = "stage" if name == "twint_parse_seconds" else "sink"
+    return f'{key}="{label}"'
+
+def Prometheus():
+    """Current metrics in the Prometheus text exposition format
+    """
+    lines = []
+    seen = set()
+    for (name, label), value in sorted(_counters.items(), key=lambda i: (i[0][0], i[0][1] or "")):
+        if name not in seen:
+            lines.append(f"# HELP {name} {_help.get(name, name)}")
+            lines.append(f"# TYPE {name} counter")
+            seen.add(name)
+        labels = _labels(name, label)
+        lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+    for (name, label), histogram in sorted(_histograms.items(), key=lambda i: (i[0][0], i[0][1] or "")):
+        if name not in seen:
+            lines.append(f"# HELP {name} {_help.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+            seen.add(name)
+        labels = _labels(name, label)
+        prefix = labels + "," if labels else ""
+        cumulative = 0
+        for bound, bucket in zip(_buckets, histogram.counts):
+            cumulative += bucket
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum}" if labels else f"{name}_sum {histogram.sum}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}" if labels else f"{name}_count {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+def Snapshot():
+    """Current metrics as a dict, with tweets/sec and users/sec since the
+    first run started
+    """
+    elapsed = time.time() - _started if _started else 0
+    counters = {}
+    for (name, label), value in _counters.items():
+        counters[name if label is None else f"{name}{{{_labels(name, label)}}}"] = value
+    histograms = {}
+    for (name, label), histogram in _histograms.items():
+        histograms[name if label is None else f"{name}{{{_labels(name, label)}}}"] = {
+            "count": histogram.count,
+            "sum": histogram.sum,
+            "mean": histogram.sum / histogram.count if histogram.count else 0,
+            "buckets": dict(zip([str(b) for b in _buckets], histogram.counts)),
+        }
+    tweets = _counters.get(("twint_tweets_total", None), 0)
+    users = _counters.get(("twint_users_total", None), 0)
+    return {
+        "time": time.time(),
+        "elapsed": elapsed,
+        "tweets_per_sec": tweets / elapsed if elapsed else 0,
+        "users_per_sec": users / elapsed if elapsed else 0,
+        "counters": counters,
+        "histograms": histograms,
+    }
+
+def _write(path):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        dump(Snapshot(), f, indent=2)
+    os.replace(tmp, path)
+
+async def _snapshots(path, interval):
+    try:
+        while True:
+            await sleep(interval)
+            _write(path)
+    except CancelledError:
+        pass
+
+async def _serve(host, port):
+    from aiohttp import web
+
+    async def handler(request):
+        return web.Response(text=Prometheus(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+async def start(config):
+    """Enable metrics for a run and start the configured exporters
+
+    Runs can nest (a sharded search, a stream), exporters are started by
+    the first one and stopped by the last one.
+    """
+    global enabled
+    global _started
+    global _users
+    global _runner
+    global _writer
+    global _file
+    if not (config.Metrics_port or config.Metrics_file):
+        return
+    trace.event(__name__, 'start')
+    enabled = True
+    _users += 1
+    if _started is None:
+        _started = time.time()
+    if config.Metrics_port and _runner is None:
+        _runner = await _serve(config.Metrics_host, config.Metrics_port)
+    if config.Metrics_file and _writer is None:
+        _file = config.Metrics_file
+        _writer = ensure_future(_snapshots(_file, config.Metrics_interval))
+
+async def stop(config):
+    global enabled
+    global _users
+    global _runner
+    global _writer
+    if not (config.Metrics_port or config.Metrics_file):
+        return
+    trace.event(__name__, 'stop')
+    _users -= 1
+    if _users > 0:
+        return
+    enabled = False
+    if _writer is not None:
+        _writer.cancel()
+        _writer = None
+        _write(_file)
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
+
+def reset():
+    global _started
+    _counters.clear()
+    _histograms.clear()
+    _started = None
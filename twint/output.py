@@ -1,9 +1,11 @@
 from datetime import datetime
+from functools import lru_cache
 
-from . import format, get
+from . import datelock, format, get, extract, metrics, trace, translate
 from .tweet import Tweet
 from .user import User
-from .storage import db, elasticsearch, write, panda
+from .storage import db, elasticsearch, write, panda, parquet
+from .storage.spool import Spool
 
 import logging as logme
 
@@ -17,57 +19,108 @@ author_list.pop()
 # used by Pandas
 _follows_object = {}
 
+# ids of the tweets near a window edge seen by a sharded search
+_shard_ids = set()
+# windows are disjoint, a tweet can only come back in the next window within
+# this many seconds of their shared edge (a day, as Windows searches by date)
+_shard_edge = 86400
+
 def _clean_follow_list():
-    logme.debug(__name__+':clean_follow_list')
+    trace.event(__name__, 'clean_follow_list')
     global _follows_object
     _follows_object = {}
 
+def _clean_shard_ids():
+    trace.event(__name__, 'clean_shard_ids')
+    _shard_ids.clear()
+
+def _spooled(_list, limit):
+    if isinstance(_list, Spool):
+        _list.limit = limit
+        return _list
+    if not limit:
+        return _list
+    spool = Spool(limit)
+    for obj in _list:
+        spool.append(obj)
+    return spool
+
+def _limit_lists(limit):
+    """Keep the lists in plain lists, or in spools when a limit is set
+    """
+    trace.event(__name__, 'limit_lists')
+    global follows_list
+    global tweets_list
+    global users_list
+    follows_list = _spooled(follows_list, limit)
+    tweets_list = _spooled(tweets_list, limit)
+    users_list = _spooled(users_list, limit)
+
 def clean_lists():
-    logme.debug(__name__+':clean_lists')
+    trace.event(__name__, 'clean_lists')
     global follows_list
     global tweets_list
     global users_list
+    for _list in (follows_list, tweets_list, users_list):
+        if isinstance(_list, Spool):
+            _list.clear()
     follows_list = []
     tweets_list = []
     users_list = []
 
-def datecheck(datetimestamp, config):
-    logme.debug(__name__+':datecheck')
+@lru_cache(maxsize=64)
+def _bound(value):
+    """Epoch seconds of a Since/Until value, in local time like datelock.Set
+    """
+    value = datelock.convertToDateTime(value)
+    try:
+        return int(datetime.strptime(value, "%Y-%m-%d %H:%M:%S").timestamp())
+    except ValueError:
+        # str() of a datetime with microseconds, e.g. a shard window bound
+        return int(datetime.strptime(value, "%Y-%m-%d %H:%M:%S.%f").timestamp())
+
+def datecheck(timestamp, config):
+    trace.event(__name__, 'datecheck')
     if config.Since:
-        logme.debug(__name__+':datecheck:SinceTrue')
-        d = int(datetime.strptime(datetimestamp, "%Y-%m-%d %H:%M:%S").timestamp())
-        s = int(datetime.strptime(config.Since, "%Y-%m-%d %H:%M:%S").timestamp())
-        if d < s:
+        trace.event(__name__, 'datecheck:SinceTrue')
+        if timestamp < _bound(config.Since):
            return False
     if config.Until:
-        logme.debug(__name__+':datecheck:UntilTrue')
-        d = int(datetime.strptime(datetimestamp, "%Y-%m-%d %H:%M:%S").timestamp())
-        s = int(datetime.strptime(config.Until, "%Y-%m-%d %H:%M:%S").timestamp())
-        if d > s:
+        trace.event(__name__, 'datecheck:UntilTrue')
+        if timestamp > _bound(config.Until):
            return False
-    logme.debug(__name__+':datecheck:dateRangeFalse')
+    trace.event(__name__, 'datecheck:dateRangeFalse')
     return True
 
 def is_tweet(tw):
-    try:
-        tw["data-item-id"]
-        logme.debug(__name__+':is_tweet:True')
+    if tw.get("data-item-id") is not None:
+        trace.event(__name__, 'is_tweet:True')
         return True
-    except:
-        logme.critical(__name__+':is_tweet:False')
-        return False
+    logme.critical(__name__+':is_tweet:False')
+    return False
+
+def _text_output(config):
+    return config.Output != None and not (config.Store_csv or config.Store_json or config.Store_parquet)
+
+def _terminal_output(config):
+    return not config.Elasticsearch and not config.Hide_output
+
+def _formatted(config):
+    """Whether the formatted line of an object is written or printed at all
+    """
+    return _text_output(config) or _terminal_output(config)
 
 def _output(obj, output, config, **extra):
-    logme.debug(__name__+':_output')
+    trace.event(__name__, '_output')
     if config.Lowercase:
         if isinstance(obj, str):
-            logme.debug(__name__+':_output:Lowercase:username')
+            trace.event(__name__, '_output:Lowercase:username')
             obj = obj.lower()
         elif obj.__class__.__name__ == "user":
-            logme.debug(__name__+':_output:Lowercase:user')
+            trace.event(__name__, '_output:Lowercase:user')
             pass
         elif obj.__class__.__name__ == "tweet":
-            logme.debug(__name__+':_output:Lowercase:tweet')
+            trace.event(__name__, '_output:Lowercase:tweet')
             obj.username = obj.username.lower()
             author_list.update({obj.username})
             for i in range(len(obj.mentions)):
@@ -81,147 +134,256 @@ def _output(obj, output, config, **extra):
             print("[x] Hidden tweet found, account suspended due to violation of TOS")
             return
     if config.Output != None:
-        if config.Store_csv:
-            try:
-                write.Csv(obj, config)
-                logme.debug(__name__+':_output:CSV')
-            except Exception as e:
-                logme.critical(__name__+':_output:CSV:Error:' + str(e))
-                print(str(e) + " [x] output._output")
-        elif config.Store_json:
-            write.Json(obj, config)
-            logme.debug(__name__+':_output:JSON')
-        else:
-            write.Text(output, config.Output)
-            logme.debug(__name__+':_output:Text')
+        with metrics.timer("twint_sink_seconds", "write"):
+            if config.Store_csv:
+                try:
+                    write.Csv(obj, config)
+                    trace.event(__name__, '_output:CSV')
+                except Exception as e:
+                    logme.critical(__name__+':_output:CSV:Error:' + str(e))
+                    print(str(e) + " [x] output._output")
+            elif config.Store_json:
+                write.Json(obj, config)
+                trace.event(__name__, '_output:JSON')
+            elif config.Store_parquet:
+                parquet.Parquet(obj, config)
+                trace.event(__name__, '_output:Parquet')
+            else:
+                write.Text(output, config.Output, config.Output_flush_interval)
+                trace.event(__name__, '_output:Text')
 
     if config.Elasticsearch:
-        logme.debug(__name__+':_output:Elasticsearch')
-        print("", end=".", flush=True)
+        trace.event(__name__, '_output:Elasticsearch')
+        if not config.Hide_output:
+            print("", end=".", flush=True)
     else:
         if not config.Hide_output:
-            try:
-                print(output.replace('\n', ' '))
-            except UnicodeEncodeError:
-                logme.critical(__name__+':_output:UnicodeEncodeError')
-                print("unicode error [x] output._output")
+            with metrics.timer("twint_sink_seconds", "terminal"):
+                try:
+                    print(output.replace('\n', ' '))
+                except UnicodeEncodeError:
+                    logme.critical(__name__+':_output:UnicodeEncodeError')
+                    print("unicode error [x] output._output")
+
+def _parse(tweet, config):
+    """Build the Tweet object of a tweet element, None when it is withheld,
+    hidden, out of the date range or already seen
+    """
+    trace.event(__name__, '_parse')
+    if config.Parser == "lxml":
+        copyright = extract.Withheld(tweet)
+    else:
+        copyright = tweet.find("div", "StreamItemContent--withheld")
+    if copyright is not None or not is_tweet(tweet):
+        logme.critical(__name__+':_parse:copyrightedTweet')
+        return None
+
+    with metrics.timer("twint_parse_seconds", "tweet"):
+        if config.Parser == "lxml":
+            tweet = extract.Tweet(tweet, config)
+        else:
+            tweet = Tweet(tweet, config)
 
-async def checkData(tweet, config, conn):
-    logme.debug(__name__+':checkData')
-    copyright = tweet.find("div", "StreamItemContent--withheld")
-    if copyright is None and is_tweet(tweet):
-        tweet = Tweet(tweet, config)
+    return tweet if _accepted(tweet, config) else None
 
-        if not tweet.datestamp:
-            logme.critical(__name__+':checkData:hiddenTweetFound')
-            print("[x] Hidden tweet found, account suspended due to violation of TOS")
-            return
+def _accepted(tweet, config):
+    """Whether a parsed tweet is visible, in the date range and not seen yet
+    """
+    if not tweet.datestamp:
+        logme.critical(__name__+':_accepted:hiddenTweetFound')
+        print("[x] Hidden tweet found, account suspended due to violation of TOS")
+        return False
 
-        if datecheck(tweet.datestamp + " " + tweet.timestamp, config):
-            output = format.Tweet(config, tweet)
+    if not datecheck(tweet.datetime // 1000, config):
+        return False
 
-            if config.Database:
-                logme.debug(__name__+':checkData:Database')
-                db.tweets(conn, tweet, config)
+    if config.Shards and config.Since and config.Until:
+        timestamp = tweet.datetime // 1000
+        if timestamp - _bound(config.Since) <= _shard_edge or _bound(config.Until) - timestamp <= _shard_edge:
+            if tweet.id in _shard_ids:
+                trace.event(__name__, '_accepted:shardDuplicate')
+                return False
+            _shard_ids.add(tweet.id)
 
-            if config.Pandas:
-                logme.debug(__name__+':checkData:Pandas')
-                panda.update(tweet, config)
+    return True
 
-            if config.Store_object:
-                logme.debug(__name__+':checkData:Store_object')
-                if hasattr(config.Store_object_tweets_list, 'append'):
-                    config.Store_object_tweets_list.append(tweet)
-                else:
-                    tweets_list.append(tweet)
+async def _sink(tweet, config, conn):
+    trace.event(__name__, '_sink')
+    output = format.Tweet(config, tweet) if _formatted(config) else None
 
-            if config.Elasticsearch:
-                logme.debug(__name__+':checkData:Elasticsearch')
-                elasticsearch.Tweet(tweet, config)
+    if config.Database:
+        trace.event(__name__, '_sink:Database')
+        with metrics.timer("twint_sink_seconds", "database"):
+            db.tweets(conn, tweet, config)
 
-            _output(tweet, output, config)
-    else:
-        logme.critical(__name__+':checkData:copyrightedTweet')
+    if config.Pandas:
+        trace.event(__name__, '_sink:Pandas')
+        with metrics.timer("twint_sink_seconds", "pandas"):
+            panda.update(tweet, config)
+
+    if config.Store_object:
+        trace.event(__name__, '_sink:Store_object')
+        with metrics.timer("twint_sink_seconds", "store_object"):
+            if hasattr(config.Store_object_tweets_list, 'append'):
+                config.Store_object_tweets_list.append(tweet)
+            else:
+                tweets_list.append(tweet)
+
+    if config.Elasticsearch:
+        trace.event(__name__, '_sink:Elasticsearch')
+        with metrics.timer("twint_sink_seconds", "elasticsearch"):
+            elasticsearch.Tweet(tweet, config)
+
+    _output(tweet, output, config)
+    metrics.count("twint_tweets_total")
+
+    if config.Stream_queue is not None:
+        trace.event(__name__, '_sink:Stream')
+        await config.Stream_queue.put(tweet)
+
+async def checkData(tweet, config, conn):
+    trace.event(__name__, 'checkData')
+    tweet = _parse(tweet, config)
+    if tweet is None:
+        return
+
+    if config.Translate:
+        await translate.Tweets([tweet], config)
+
+    await _sink(tweet, config, conn)
+
+def _selected(tw, config):
+    if config.TwitterSearch:
+        return True
+    return int(tw.get("data-user-id")) == config.User_id or config.Retweets
 
 async def Tweets(tweets, config, conn, url=''):
-    logme.debug(__name__+':Tweets')
+    trace.event(__name__, 'Tweets')
     if config.Favorites or config.Profile_full or config.Location:
-        logme.debug(__name__+':Tweets:fav+full+loc')
+        trace.event(__name__, 'Tweets:fav+full+loc')
         for tw in tweets:
-            if tw['data-item-id'] == url.split('?')[0].split('/')[-1]:
+            if tw.get('data-item-id') == url.split('?')[0].split('/')[-1]:
                 await checkData(tw, config, conn)
-    elif config.TwitterSearch:
-        logme.debug(__name__+':Tweets:TwitterSearch')
+    elif _selected(tweets, config):
+        trace.event(__name__, 'Tweets:selected')
         await checkData(tweets, config, conn)
-    else:
-        logme.debug(__name__+':Tweets:else')
-        if int(tweets["data-user-id"]) == config.User_id or config.Retweets:
-            await checkData(tweets, config, conn)
+
+async def Page(tweets, config, conn):
+    """Output a page of tweet elements from a search or profile feed
+
+    Tweets of the page are parsed first and translated together, so
+    translation costs one batch per page instead of a request per tweet.
+    """
+    trace.event(__name__, 'Page')
+    parsed = []
+    for tw in tweets:
+        if _selected(tw, config):
+            tweet = _parse(tw, config)
+            if tweet is not None:
+                parsed.append(tweet)
+
+    if config.Translate and parsed:
+        await translate.Tweets(parsed, config)
+
+    for tweet in parsed:
+        await _sink(tweet, config, conn)
+
+async def Records(tweets, config, conn):
+    """Output a page of Tweet objects already built by the parse executor
+    """
+    trace.event(__name__, 'Records')
+    parsed = [tweet for tweet in tweets
+              if (config.TwitterSearch or tweet.user_id == config.User_id or config.Retweets)
+              and _accepted(tweet, config)]
+
+    if config.Translate and parsed:
+        await translate.Tweets(parsed, config)
+
+    for tweet in parsed:
+        await _sink(tweet, config, conn)
 
 async def Users(u, config, conn):
-    logme.debug(__name__+':User')
+    trace.event(__name__, 'User')
     global users_list
 
     user = User(u)
-    output = format.User(config.Format, user)
+    output = format.User(config.Format, user) if _formatted(config) else None
 
     if config.Database:
-        logme.debug(__name__+':User:Database')
-        db.user(conn, config, user)
+        trace.event(__name__, 'User:Database')
+        with metrics.timer("twint_sink_seconds", "database"):
+            db.user(conn, config, user)
 
     if config.Elasticsearch:
-        logme.debug(__name__+':User:Elasticsearch')
-        _save_date = user.join_date
-        _save_time = user.join_time
-        user.join_date = str(datetime.strptime(user.join_date, "%d %b %Y")).split()[0]
-        user.join_time = str(datetime.strptime(user.join_time, "%I:%M %p")).split()[1]
-        elasticsearch.UserProfile(user, config)
-        user.join_date = _save_date
-        user.join_time = _save_time
+        trace.event(__name__, 'User:Elasticsearch')
+        with metrics.timer("twint_sink_seconds", "elasticsearch"):
+            _save_date = user.join_date
+            _save_time = user.join_time
+            user.join_date = str(datetime.strptime(user.join_date, "%d %b %Y")).split()[0]
+            user.join_time = str(datetime.strptime(user.join_time, "%I:%M %p")).split()[1]
+            elasticsearch.UserProfile(user, config)
+            user.join_date = _save_date
+            user.join_time = _save_time
 
     if config.Store_object:
-        logme.debug(__name__+':User:Store_object')
+        trace.event(__name__, 'User:Store_object')
 
         if config.Followers or config.Following:
-            if hasattr(config.Store_object_follow_list, 'append'):
-                config.Store_object_follow_list.append(user)
-            else:
-                users_list.append(user) # twint.user.user
+            with metrics.timer("twint_sink_seconds", "store_object"):
+                if hasattr(config.Store_object_follow_list, 'append'):
+                    config.Store_object_follow_list.append(user)
+                else:
+                    users_list.append(user) # twint.user.user
 
     if config.Pandas:
-        logme.debug(__name__+':User:Pandas+user')
-        panda.update(user, config)
+        trace.event(__name__, 'User:Pandas+user')
+        with metrics.timer("twint_sink_seconds", "pandas"):
+            panda.update(user, config)
 
     _output(user, output, config)
+    metrics.count("twint_users_total")
+
+    if config.Stream_queue is not None:
+        trace.event(__name__, 'User:Stream')
+        await config.Stream_queue.put(user)
 
 async def Username(username, config, conn):
-    logme.debug(__name__+':Username')
+    trace.event(__name__, 'Username')
     global _follows_object
     global follows_list
     follow_var = config.Following*"following" + config.Followers*"followers"
 
     if config.Database:
-        logme.debug(__name__+':Username:Database')
-        db.follow(conn, config.Username, config.Followers, username)
+        trace.event(__name__, 'Username:Database')
+        with metrics.timer("twint_sink_seconds", "database"):
+            db.follow(conn, config.Username, config.Followers, username)
 
     if config.Elasticsearch:
-        logme.debug(__name__+':Username:Elasticsearch')
-        elasticsearch.Follow(username, config)
+        trace.event(__name__, 'Username:Elasticsearch')
+        with metrics.timer("twint_sink_seconds", "elasticsearch"):
+            elasticsearch.Follow(username, config)
 
     if config.Store_object:
-        if hasattr(config.Store_object_follow_list, 'append'):
-            config.Store_object_follow_list.append(username)
-        else:
-            follows_list.append(username) # twint.user.user
+        with metrics.timer("twint_sink_seconds", "store_object"):
+            if hasattr(config.Store_object_follow_list, 'append'):
+                config.Store_object_follow_list.append(username)
+            else:
+                follows_list.append(username) # twint.user.user
 
     if config.Pandas:
-        logme.debug(__name__+':Username:object+pandas')
-        try:
-            _ = _follows_object[config.Username][follow_var]
-        except KeyError:
-            _follows_object.update({config.Username: {follow_var: []}})
-        _follows_object[config.Username][follow_var].append(username)
-        if config.Pandas_au:
-            logme.debug(__name__+':Username:object+pandas+au')
-            panda.update(_follows_object[config.Username], config)
+        trace.event(__name__, 'Username:object+pandas')
+        with metrics.timer("twint_sink_seconds", "pandas"):
+            try:
+                _ = _follows_object[config.Username][follow_var]
+            except KeyError:
+                _follows_object.update({config.Username: {follow_var: []}})
+            _follows_object[config.Username][follow_var].append(username)
+            if config.Pandas_au:
+                trace.event(__name__, 'Username:object+pandas+au')
+                panda.update(_follows_object[config.Username], config)
     _output(username, username, config)
+    metrics.count("twint_users_total")
+
+    if config.Stream_queue is not None:
+        trace.event(__name__, 'Username:Stream')
+        await config.Stream_queue.put(username)
@@ -0,0 +1,80 @@
+from asyncio import get_event_loop
+from concurrent.futures import ProcessPoolExecutor
+from json import loads
+from types import SimpleNamespace
+import atexit
+
+from . import extract, trace, feed as _feed
+from .tweet import Tweet
+
+
+_executor = None
+_workers = 0
+
+def Offloaded(config):
+    """Whether feed pages of this run are parsed in worker processes
+
+    Only search and profile pages are, the other feeds hold elements that
+    are fetched again one by one and stay on the event loop.
+    """
+    if config.Parse_workers <= 0:
+        return False
+    if config.TwitterSearch:
+        return not config.Location
+    return config.Profile and not config.Profile_full
+
+def _options(config):
+    # the parts of the config the Tweet builders read, without anything
+    # that can not be pickled (lists, translators, callbacks)
+    return SimpleNamespace(Parser=config.Parser, Profile=config.Profile,
+                           User_id=config.User_id, Username=config.Username,
+                           Near=config.Near, Geo=config.Geo, Source=config.Source)
+
+def _page(response, profile, options):
+    """Parse a feed page into Tweet objects, runs in a worker process
+    """
+    json_response = loads(response)
+    feed = _feed._tweets(json_response["items_html"], options.Parser)
+    if profile:
+        cursor = feed[-1].get("data-item-id")
+    else:
+        cursor = json_response["min_position"]
+
+    tweets = []
+    for tw in feed:
+        if options.Parser == "lxml":
+            if extract.Withheld(tw) is not None or tw.get("data-item-id") is None:
+                continue
+            tweets.append(extract.Tweet(tw, options))
+        else:
+            if tw.find("div", "StreamItemContent--withheld") is not None or tw.get("data-item-id") is None:
+                continue
+            tweets.append(Tweet(tw, options))
+    return tweets, cursor
+
+def _pool(workers):
+    global _executor
+    global _workers
+    if _executor is None or _workers != workers:
+        close()
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _workers = workers
+    return _executor
+
+async def Page(response, config):
+    """Parse a search or profile feed page in the parse executor
+
+    Returns the Tweet objects of the page and the cursor of the next one.
+    """
+    trace.event(__name__, 'Page')
+    executor = _pool(config.Parse_workers)
+    return await get_event_loop().run_in_executor(executor, _page, response,
+                                                  not config.TwitterSearch, _options(config))
+
+def close():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+atexit.register(close)
@@ -0,0 +1,116 @@
+'''
+profiler.py - Profile a scrape run.
+
+config.Profile_output names the file the profile is written to when the
+run ends:
+
+    twint -s python --profile-output run.prof
+    python -m pstats run.prof
+
+    twint -s python --profile-output run.folded --profiler sampling
+    flamegraph.pl run.folded > run.svg
+
+"cprofile" writes pstats data, "sampling" samples the scraping thread's
+stack every config.Profile_interval seconds and writes collapsed stacks,
+one "frame;frame;... count" line per stack, which flamegraph.pl and
+speedscope read. With config.Profile_memory the allocations that grew
+most during the run are written next to it, to <Profile_output>.memory.
+'''
+from collections import Counter
+import cProfile
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+from . import trace
+
+# a run inside a profiled run (a shard, a stream) is not profiled again
+_active = False
+
+class Sampler:
+    """Collapsed stacks of one thread, sampled from a background thread
+    """
+    def __init__(self, interval, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="twint-sampler", daemon=True)
+
+    @staticmethod
+    def _name(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            stack.append(self._name(frame))
+            frame = frame.f_back
+        if stack:
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+def _memory(path, before, after, top=50):
+    stats = after.compare_to(before, "lineno")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"Top {top} allocation sites by growth during the run\n\n")
+        for stat in stats[:top]:
+            f.write(f"{stat}\n")
+
+async def Profiled(coro, config):
+    """Await coro under the configured profiler, then write the profile
+    """
+    global _active
+    if _active:
+        return await coro
+    _active = True
+    trace.event(__name__, 'Profiled')
+
+    snapshot = None
+    if config.Profile_memory:
+        _tracing = tracemalloc.is_tracing()
+        if not _tracing:
+            tracemalloc.start()
+        snapshot = tracemalloc.take_snapshot()
+
+    if config.Profiler == "sampling":
+        profiler = Sampler(config.Profile_interval)
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        if config.Profiler == "sampling":
+            profiler.stop()
+            profiler.dump(config.Profile_output)
+        else:
+            profiler.disable()
+            profiler.dump_stats(config.Profile_output)
+        if snapshot is not None:
+            _memory(config.Profile_output + ".memory", snapshot, tracemalloc.take_snapshot())
+            if not _tracing:
+                tracemalloc.stop()
+        _active = False
@@ -1,72 +1,93 @@
-import sys, os, time
-from asyncio import get_event_loop, TimeoutError, ensure_future, new_event_loop, set_event_loop
+import sys, copy, time
+from asyncio import get_event_loop, TimeoutError, ensure_future, new_event_loop, set_event_loop, gather, sleep, Queue, CancelledError
 from datetime import datetime
 
-from . import datelock, feed, get, output, verbose, storage
-from .storage import db
+from . import checkpoint, datelock, feed, get, metrics, output, parse, profiler, trace, verbose, storage
+from .storage import db, elasticsearch, write, parquet
 #from . import _logme
 #
 #logme = _logme._logger(__name__)
 
 import logging as logme
 
-class Twint:
-    def __init__(self, config):
-        logme.debug(__name__+':Twint:__init__')
-        if config.Resume is not None and (config.TwitterSearch or config.Followers or config.Following):
-            logme.debug(__name__+':Twint:__init__:Resume')
-            self.init = self.get_resume(config.Resume)
-        else:
-            self.init = '-1'
+class Total:
+    """Items output by the runs sharing a limit, e.g. the windows of a sharded search
+    """
+    def __init__(self):
+        self.count = 0
 
+class Twint:
+    def __init__(self, config, session=None, conn=None, total=None):
+        trace.event(__name__, 'Twint:__init__')
+        self.init = '-1'
         self.feed = [-1]
         self.count = 0
+        self.done = False
+        # set by Feed when it stops on an error rather than at the end of the feed
+        self.failed = False
+        self.exhausted = False
+        self.fingerprint = None
+        # items scraped for this query by earlier, interrupted runs
+        self.resumed_count = 0
+        if config.Resume is not None and (config.TwitterSearch or config.Followers or config.Following):
+            trace.event(__name__, 'Twint:__init__:Resume')
+            self.fingerprint = checkpoint.Fingerprint(config)
+            state = checkpoint.Load(config.Resume, self.fingerprint)
+            if state is not None:
+                self.init, self.resumed_count, self.done = state
+
         self.user_agent = ""
         self.config = config
-        self.conn = db.Conn(config.Database)
+        self.session = session
+        # a session passed in is shared with other runs and is not ours to replace
+        self.own_session = session is None
+        # sessions replaced after a Tor identity change, closed between pages
+        self.retired = []
+        self.total = total if total is not None else Total()
+        if conn is None:
+            conn = db.Conn(config.Database, config.Database_batch_size, config.Database_flush_interval)
+        self.conn = conn
         self.d = datelock.Set(self.config.Until, self.config.Since)
         verbose.Elastic(config.Elasticsearch)
 
         if self.config.Store_object:
-            logme.debug(__name__+':Twint:__init__:clean_follow_list')
+            trace.event(__name__, 'Twint:__init__:clean_follow_list')
             output._clean_follow_list()
+            output._limit_lists(self.config.Store_object_limit)
 
         if self.config.Pandas_clean:
-            logme.debug(__name__+':Twint:__init__:pandas_clean')
+            trace.event(__name__, 'Twint:__init__:pandas_clean')
             storage.panda.clean()
 
-    def get_resume(self, resumeFile):
-        if not os.path.exists(resumeFile):
-            return '-1'
-        with open(resumeFile, 'r') as rFile:
-            _init = rFile.readlines()[-1].strip('\n')
-            return _init
-
     async def Feed(self):
-        logme.debug(__name__+':Twint:Feed')
+        trace.event(__name__, 'Twint:Feed')
         consecutive_errors_count = 0
+        self.failed = False
         while True:
-            response = await get.RequestUrl(self.config, self.init, headers=[("User-Agent", self.user_agent)])
+            response = await get.RequestUrl(self.config, self.init, headers=[("User-Agent", self.user_agent)], session=self.session)
             if self.config.Debug:
                 print(response, file=open("twint-last-request.log", "w", encoding="utf-8"))
 
             self.feed = []
+            parse_start = time.perf_counter()
             try:
                 if self.config.Favorites:
                     self.feed, self.init = feed.Mobile(response)
-                    if not self.count%40:
-                        time.sleep(5)
                 elif self.config.Followers or self.config.Following:
                     self.feed, self.init = feed.Follow(response)
-                    if not self.count%40:
-                        time.sleep(5)
                 elif self.config.Profile:
                     if self.config.Profile_full:
                         self.feed, self.init = feed.Mobile(response)
+                    elif parse.Offloaded(self.config):
+                        self.feed, self.init = await parse.Page(response, self.config)
                     else:
-                        self.feed, self.init = feed.profile(response)
+                        self.feed, self.init = feed.profile(response, self.config.Parser)
                 elif self.config.TwitterSearch:
-                    self.feed, self.init = feed.Json(response)
+                    if parse.Offloaded(self.config):
+                        self.feed, self.init = await parse.Page(response, self.config)
+                    else:
+                        self.feed, self.init = feed.Json(response, self.config.Parser)
+                metrics.observe("twint_parse_seconds", time.perf_counter() - parse_start, "feed")
                 break
             except TimeoutError as e:
                 if self.config.Proxy_host.lower() == "tor":
@@ -75,13 +96,20 @@ class Twint:
                         logme.critical(__name__+':Twint:Feed:tor-password')
                         sys.stderr.write("Error: config.Tor_control_password must be set for proxy autorotation!\r\n")
                         sys.stderr.write("Info: What is it? See https://stem.torproject.org/faq.html#can-i-interact-with-tors-controller-interface-directly\r\n")
+                        self.failed = True
                         break
                     else:
                         get.ForceNewTorIdentity(self.config)
+                        if self.own_session:
+                            # pooled connections would keep using the old circuit, the
+                            # old session may still serve the page being processed
+                            self.retired.append(self.session)
+                            self.session = get.Session(self.config)
                         continue
                 else:
                     logme.critical(__name__+':Twint:Feed:' + str(e))
                     print(str(e))
+                    self.failed = True
                     break
             except Exception as e:
                 if self.config.Profile or self.config.Favorites:
@@ -91,121 +119,284 @@ class Twint:
                 # Sometimes Twitter says there is no data. But it's a lie.
                 consecutive_errors_count += 1
                 if consecutive_errors_count < self.config.Retries_count:
+                    metrics.count("twint_retries_total")
                     self.user_agent = await get.RandomUserAgent()
                     continue
                 logme.critical(__name__+':Twint:Feed:Tweets_known_error:' + str(e))
                 print(str(e) + " [x] run.Feed")
                 print("[!] if get this error but you know for sure that more tweets exist, please open an issue and we will investigate it!")
+                self.failed = True
                 break
-        if self.config.Resume:
-            print(self.init, file=open(self.config.Resume, "a", encoding="utf-8"))
 
-    async def follow(self):
-        await self.Feed()
+    def flush(self):
+        """Store the rows buffered by the outputs
+        """
+        if self.conn:
+            self.conn.flush()
+        if self.config.Elasticsearch:
+            elasticsearch.flush()
+        write.flush()
+        # finishes the current Parquet part files, later rows go to new ones
+        parquet.close()
+
+    def checkpoint(self, init, done=False):
+        if self.fingerprint is not None:
+            # the rows of the pages before the cursor must not be lost with the process
+            self.flush()
+            checkpoint.Save(self.config.Resume, self.fingerprint, init,
+                            self.resumed_count + self.count, done)
+
+    async def page(self, feed):
+        if parse.Offloaded(self.config):
+            await output.Records(feed, self.config, self.conn)
+        else:
+            await output.Page(feed, self.config, self.conn)
+
+    async def follow(self, feed):
         if self.config.User_full:
-            logme.debug(__name__+':Twint:follow:userFull')
-            self.count += await get.Multi(self.feed, self.config, self.conn)
+            trace.event(__name__, 'Twint:follow:userFull')
+            self.count += await get.Multi(feed, self.config, self.conn, self.session)
         else:
-            logme.debug(__name__+':Twint:follow:notUserFull')
-            for user in self.feed:
+            trace.event(__name__, 'Twint:follow:notUserFull')
+            for user in feed:
                 self.count += 1
                 username = user.find("a")["name"]
                 await output.Username(username, self.config, self.conn)
 
-    async def favorite(self):
-        logme.debug(__name__+':Twint:favorite')
-        await self.Feed()
-        self.count += await get.Multi(self.feed, self.config, self.conn)
+    async def favorite(self, feed):
+        trace.event(__name__, 'Twint:favorite')
+        self.count += await get.Multi(feed, self.config, self.conn, self.session)
 
-    async def profile(self):
-        await self.Feed()
+    async def profile(self, feed):
         if self.config.Profile_full:
-            logme.debug(__name__+':Twint:profileFull')
-            self.count += await get.Multi(self.feed, self.config, self.conn)
+            trace.event(__name__, 'Twint:profileFull')
+            self.count += await get.Multi(feed, self.config, self.conn, self.session)
         else:
-            logme.debug(__name__+':Twint:notProfileFull')
-            for tweet in self.feed:
-                self.count += 1
-                await output.Tweets(tweet, self.config, self.conn)
+            trace.event(__name__, 'Twint:notProfileFull')
+            self.count += len(feed)
+            await self.page(feed)
 
-    async def tweets(self):
-        await self.Feed()
+    async def tweets(self, feed):
         if self.config.Location:
-            logme.debug(__name__+':Twint:tweets:location')
-            self.count += await get.Multi(self.feed, self.config, self.conn)
+            trace.event(__name__, 'Twint:tweets:location')
+            self.count += await get.Multi(feed, self.config, self.conn, self.session)
         else:
-            logme.debug(__name__+':Twint:tweets:notLocation')
-            for tweet in self.feed:
-                self.count += 1
-                await output.Tweets(tweet, self.config, self.conn)
-
-    async def main(self, callback=None):
-
-        task = ensure_future(self.run())  # Might be changed to create_task in 3.7+.
+            trace.event(__name__, 'Twint:tweets:notLocation')
+            self.count += len(feed)
+            await self.page(feed)
+
+    async def produce(self, queue):
+        """Fetch feed pages ahead of their processing
+
+        Puts (feed, cursor) pairs in the queue, then None once the feed is
+        exhausted, the limit is reached or fetching failed, or the exception
+        that stopped it. self.exhausted tells whether the feed ran out.
+        """
+        trace.event(__name__, 'Twint:produce')
+        fetched = 0
+        try:
+            while True:
+                await self.Feed()
+                if not self.feed:
+                    trace.event(__name__, 'Twint:produce:no-more-tweets')
+                    self.exhausted = not self.failed
+                    break
+                if (self.config.Favorites or self.config.Followers or self.config.Following) and not fetched%40:
+                    await sleep(5)
+                await queue.put((self.feed, self.init))
+                fetched += len(self.feed)
+                if get.Limit(self.config.Limit, fetched) or get.Limit(self.config.Limit, self.total.count):
+                    trace.event(__name__, 'Twint:produce:reachedLimit')
+                    break
+        except CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(e)
+            return
+        await queue.put(None)
+
+    async def consume(self, feed):
+        if self.config.Followers or self.config.Following:
+            trace.event(__name__, 'Twint:consume:follow')
+            await self.follow(feed)
+        elif self.config.Favorites:
+            trace.event(__name__, 'Twint:consume:favorites')
+            await self.favorite(feed)
+        elif self.config.Profile:
+            trace.event(__name__, 'Twint:consume:profile')
+            await self.profile(feed)
+        elif self.config.TwitterSearch:
+            trace.event(__name__, 'Twint:consume:twitter-search')
+            await self.tweets(feed)
+
+    async def pipeline(self):
+        """Process feed pages while the next ones are being fetched
+
+        At most Prefetch pages wait in the queue. The resume cursor of a
+        page is written once the page has been processed, and the query is
+        marked done once the feed has run out.
+        """
+        trace.event(__name__, 'Twint:pipeline')
+        queue = Queue(max(self.config.Prefetch, 1))
+        producer = ensure_future(self.produce(queue))
+        try:
+            while True:
+                page = await queue.get()
+                if page is None:
+                    if self.exhausted:
+                        self.checkpoint(self.init, done=True)
+                    break
+                if isinstance(page, Exception):
+                    raise page
+                feed, init = page
+                if get.Limit(self.config.Limit, self.total.count):
+                    # reached by the other runs sharing the limit
+                    trace.event(__name__, 'Twint:pipeline:reachedLimit')
+                    break
+                count = self.count
+                await self.consume(feed)
+                self.total.count += self.count - count
+                self.checkpoint(init)
+                await self.close_retired()
+
+                if get.Limit(self.config.Limit, self.total.count):
+                    trace.event(__name__, 'Twint:pipeline:reachedLimit')
+                    break
+        finally:
+            producer.cancel()
+            try:
+                await producer
+            except CancelledError:
+                pass
 
-        if callback:
-            task.add_done_callback(callback)
+    async def close_retired(self):
+        while self.retired:
+            await self.retired.pop().close()
 
-        await task
+    async def main(self, callback=None):
+        if self.own_session:
+            self.session = get.Session(self.config)
+        await metrics.start(self.config)
+        try:
+            task = ensure_future(self.run())  # Might be changed to create_task in 3.7+.
+
+            if callback:
+                task.add_done_callback(callback)
+
+            await task
+        finally:
+            if self.own_session:
+                await self.close_retired()
+                await self.session.close()
+            if self.conn:
+                self.conn.flush()
+            if self.config.Elasticsearch:
+                elasticsearch.flush()
+            write.close()
+            parquet.close()
+            if self.config.Resume is not None:
+                checkpoint.close(self.config.Resume)
+            await metrics.stop(self.config)
+
+    async def lookup(self):
+        if self.config.User_id is not None and self.config.Username is None:
+            trace.event(__name__, 'Twint:main:user_id')
+            checkpoint.Derive(self.config, "Username",
+                              await get.Username(self.config.User_id, session=self.session,
+                                                 base_url=self.config.Base_url))
+
+        if self.config.Username is not None and self.config.User_id is None:
+            trace.event(__name__, 'Twint:main:username')
+            url = f"{self.config.Base_url}/{self.config.Username}?lang=en"
+            checkpoint.Derive(self.config, "User_id",
+                              await get.User(url, self.config, self.conn, True, session=self.session))
+        elif self.config.User_id is not None:
+            checkpoint.Derive(self.config, "User_id", int(self.config.User_id))
 
     async def run(self):
+        if self.done:
+            trace.event(__name__, 'Twint:run:checkpoint-done')
+            return
+
         if self.config.TwitterSearch:
             self.user_agent = await get.RandomUserAgent(wa=True)
         else:
             self.user_agent = await get.RandomUserAgent()
 
-        if self.config.User_id is not None:
-            logme.debug(__name__+':Twint:main:user_id')
-            self.config.Username = await get.Username(self.config.User_id)
-
-        if self.config.Username is not None:
-            logme.debug(__name__+':Twint:main:username')
-            url = f"https://twitter.com/{self.config.Username}?lang=en"
-            self.config.User_id = await get.User(url, self.config, self.conn, True)
+        await self.lookup()
 
         if self.config.TwitterSearch and self.config.Since and self.config.Until:
-            logme.debug(__name__+':Twint:main:search+since+until')
-            while self.d._since < self.d._until:
-                self.config.Since = str(self.d._since)
-                self.config.Until = str(self.d._until)
-                if len(self.feed) > 0:
-                    await self.tweets()
-                else:
-                    logme.debug(__name__+':Twint:main:gettingNewTweets')
-                    break
-
-                if get.Limit(self.config.Limit, self.count):
-                    break
+            trace.event(__name__, 'Twint:main:search+since+until')
+            if self.d._since < self.d._until:
+                checkpoint.Derive(self.config, "Since", str(self.d._since))
+                checkpoint.Derive(self.config, "Until", str(self.d._until))
+                await self.pipeline()
         else:
-            logme.debug(__name__+':Twint:main:not-search+since+until')
-            while True:
-                if len(self.feed) > 0:
-                    if self.config.Followers or self.config.Following:
-                        logme.debug(__name__+':Twint:main:follow')
-                        await self.follow()
-                    elif self.config.Favorites:
-                        logme.debug(__name__+':Twint:main:favorites')
-                        await self.favorite()
-                    elif self.config.Profile:
-                        logme.debug(__name__+':Twint:main:profile')
-                        await self.profile()
-                    elif self.config.TwitterSearch:
-                        logme.debug(__name__+':Twint:main:twitter-search')
-                        await self.tweets()
-                else:
-                    logme.debug(__name__+':Twint:main:no-more-tweets')
-                    break
-
-                #logging.info("[<] " + str(datetime.now()) + ':: run+Twint+main+CallingGetLimit2')
-                if get.Limit(self.config.Limit, self.count):
-                    logme.debug(__name__+':Twint:main:reachedLimit')
-                    break
+            trace.event(__name__, 'Twint:main:not-search+since+until')
+            await self.pipeline()
 
         if self.config.Count:
             verbose.Count(self.count, self.config)
 
+async def Shards(config, callback=None):
+    trace.event(__name__, 'Shards')
+    output._clean_shard_ids()
+    if config.Pandas_clean:
+        storage.panda.clean()
+
+    d = datelock.Set(config.Until, config.Since)
+    windows = datelock.Windows(d._since, d._until, config.Shards, config.Shard_days)
+    session = get.Session(config)
+    conn = db.Conn(config.Database, config.Database_batch_size, config.Database_flush_interval)
+    density = []
+    # the limit applies to all windows together
+    total = Total()
+
+    async def worker():
+        while windows and not get.Limit(config.Limit, total.count):
+            since, until = windows.pop(0)
+            if config.Shard_adaptive and density:
+                parts = int(density[-1] * (until - since).total_seconds() / config.Shard_tweets)
+                if parts > 1:
+                    trace.event(__name__, 'Shards:split')
+                    windows[:0] = datelock.Windows(since, until, parts)
+                    continue
+
+            trace.event(__name__, 'Shards:window')
+            _config = copy.copy(config)
+            _config.Since = str(since)
+            _config.Until = str(until)
+            _config.Count = False
+            _config.Pandas_clean = False
+            _twint = Twint(_config, session, conn, total)
+            await _twint.run()
+            density.append(_twint.count / max((until - since).total_seconds(), 1))
+
+    await metrics.start(config)
+    try:
+        await Twint(config, session, conn).lookup()
+        task = ensure_future(gather(*[worker() for _ in range(config.Shards)]))
+        if callback:
+            task.add_done_callback(callback)
+        await task
+    finally:
+        await session.close()
+        if conn:
+            conn.flush()
+        if config.Elasticsearch:
+            elasticsearch.flush()
+        write.close()
+        parquet.close()
+        if config.Resume is not None:
+            checkpoint.close(config.Resume)
+        output._clean_shard_ids()
+        await metrics.stop(config)
+
+    if config.Count:
+        verbose.Count(total.count, config)
+
 def run(config, callback=None):
-    logme.debug(__name__+':run')
+    trace.event(__name__, 'run')
     try:
         get_event_loop()
     except RuntimeError as e:
@@ -218,10 +409,23 @@ def run(config, callback=None):
         logme.exception(__name__+':Lookup:Unexpected exception occured while attempting to get or create a new event loop.')
         raise
 
-    get_event_loop().run_until_complete(Twint(config).main(callback))
+    get_event_loop().run_until_complete(engine(config, callback))
+
+def engine(config, callback=None):
+    """Coroutine running the configured scrape
+    """
+    if config.TwitterSearch and config.Shards:
+        coro = Shards(config, callback)
+    else:
+        coro = Twint(config).main(callback)
+    if config.Trace:
+        coro = trace.Traced(coro, config)
+    if config.Profile_output:
+        return profiler.Profiled(coro, config)
+    return coro
 
 def Favorites(config):
-    logme.debug(__name__+':Favorites')
+    trace.event(__name__, 'Favorites')
     config.Favorites = True
     config.Following = False
     config.Followers = False
@@ -233,7 +437,7 @@ def Favorites(config):
         storage.panda._autoget("tweet")
 
 def Followers(config):
-    logme.debug(__name__+':Followers')
+    trace.event(__name__, 'Followers')
     config.Followers = True
     config.Following = False
     config.Profile = False
@@ -250,7 +454,7 @@ def Followers(config):
         output._clean_follow_list()
 
 def Following(config):
-    logme.debug(__name__+':Following')
+    trace.event(__name__, 'Following')
     config.Following = True
     config.Followers = False
     config.Profile = False
@@ -267,7 +471,7 @@ def Following(config):
         output._clean_follow_list()
 
 def Lookup(config):
-    logme.debug(__name__+':Lookup')
+    trace.event(__name__, 'Lookup')
 
     try:
         get_event_loop()
@@ -283,11 +487,18 @@ def Lookup(config):
 
     try:
         if config.User_id is not None:
-            logme.debug(__name__+':Twint:Lookup:user_id')
-            config.Username = get_event_loop().run_until_complete(get.Username(config.User_id))
-
-        url = f"https://twitter.com/{config.Username}?lang=en"
-        get_event_loop().run_until_complete(get.User(url, config, db.Conn(config.Database)))
+            trace.event(__name__, 'Twint:Lookup:user_id')
+            config.Username = get_event_loop().run_until_complete(get.Username(config.User_id, base_url=config.Base_url))
+
+        url = f"{config.Base_url}/{config.Username}?lang=en"
+        conn = db.Conn(config.Database, config.Database_batch_size, config.Database_flush_interval)
+        get_event_loop().run_until_complete(get.User(url, config, conn))
+        if conn:
+            conn.flush()
+        if config.Elasticsearch:
+            elasticsearch.flush()
+        write.close()
+        parquet.close()
 
         if config.Pandas_au:
             storage.panda._autoget("user")
@@ -301,7 +512,7 @@ def Lookup(config):
         raise
 
 def Profile(config):
-    logme.debug(__name__+':Profile')
+    trace.event(__name__, 'Profile')
     config.Profile = True
     config.Favorites = False
     config.Following = False
@@ -312,7 +523,7 @@ def Profile(config):
         storage.panda._autoget("tweet")
 
 def Search(config, callback=None):
-    logme.debug(__name__+':Search')
+    trace.event(__name__, 'Search')
     config.TwitterSearch = True
     config.Favorites = False
     config.Following = False
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+import sqlite3
+import time
+
+class Cache:
+    """LRU cache in memory in front of an optional SQLite table
+
+    Values are tuples of the table's columns after the key. The table also
+    gets a time_update column, the time a row was written in milliseconds.
+    """
+    def __init__(self, table, key, columns):
+        self.table = table
+        self.key = key
+        self.columns = columns
+        self.memory = OrderedDict()
+        self.disk = None
+        self.path = None
+
+    def _open(self, path):
+        if self.path != path:
+            self.disk = sqlite3.connect(path)
+            columns = ",\n".join(f"{name} {_type}" for name, _type in [(self.key, "text not null")] + self.columns)
+            self.disk.execute(f"""
+                CREATE TABLE IF NOT EXISTS
+                    {self.table} (
+                        {columns},
+                        time_update integer not null,
+                        PRIMARY KEY ({self.key})
+                    );
+            """)
+            self.path = path
+        return self.disk
+
+    def _remember(self, key, value, size):
+        self.memory[key] = value
+        while len(self.memory) > size:
+            self.memory.popitem(last=False)
+
+    def get(self, key, size, path=None):
+        """Value of key from memory, else from the table at path, else None
+        """
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key]
+        if path:
+            names = ", ".join(name for name, _ in self.columns)
+            row = self._open(path).execute(
+                f"SELECT {names} FROM {self.table} WHERE {self.key} = ?", (key,)).fetchone()
+            if row:
+                self._remember(key, row, size)
+                return row
+        return None
+
+    def put(self, values, size, path=None):
+        """Store a {key: value} dict in memory, and in the table at path
+        """
+        for key, value in values.items():
+            self._remember(key, tuple(value), size)
+        if path:
+            now = round(time.time()*1000)
+            marks = ",".join("?" * (len(self.columns) + 2))
+            with self._open(path) as conn:
+                conn.executemany(f"INSERT OR REPLACE INTO {self.table} VALUES({marks})",
+                                 [(key,) + tuple(value) + (now,) for key, value in values.items()])
@@ -5,13 +5,45 @@ import hashlib
 
 from datetime import datetime
 
-def Conn(database):
+class Writer:
+    """Group inserts into batched transactions
+    """
+    def __init__(self, conn, batch_size, flush_interval):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending = {}
+        self.count = 0
+        self.last_flush = time.time()
+        self.hashes = dict(conn.execute('SELECT id, hex_dig FROM users ORDER BY time_update'))
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def insert(self, query, entry):
+        self.pending.setdefault(query, []).append(entry)
+        self.count += 1
+        if self.count >= self.batch_size or time.time() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.time()
+        if not self.pending:
+            return
+        with self.conn:
+            for query, entries in self.pending.items():
+                self.conn.executemany(query, entries)
+        self.pending = {}
+        self.count = 0
+
+def Conn(database, batch_size=500, flush_interval=5):
     if database:
         print("[+] Inserting into Database: " + str(database))
         conn = init(database)
         if isinstance(conn, str):
             print(str)
             sys.exit(1)
+        conn = Writer(conn, batch_size, flush_interval)
     else:
         conn = ""
 
@@ -21,6 +53,8 @@ def init(db):
     try:
         conn = sqlite3.connect(db)
         cursor = conn.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
 
         table_users = """
             CREATE TABLE IF NOT EXISTS
@@ -195,99 +229,75 @@ def uTable(Followers):
     return table
 
 def follow(conn, Username, Followers, User):
-    try:
-        time_ms = round(time.time()*1000)
-        cursor = conn.cursor()
-        entry = (User, time_ms, Username,)
-        table = fTable(Followers)
-        query = f"INSERT INTO {table} VALUES(?,?,?)"
-        cursor.execute(query, entry)
-        conn.commit()
-    except sqlite3.IntegrityError:
-        pass
-
-def get_hash_id(conn, id):
-    cursor = conn.cursor()
-    cursor.execute('SELECT hex_dig FROM users WHERE id = ? LIMIT 1', (id,))
-    resultset = cursor.fetchall()
-    return resultset[0][0] if resultset else -1
+    time_ms = round(time.time()*1000)
+    entry = (User, time_ms, Username,)
+    table = fTable(Followers)
+    query = f"INSERT OR IGNORE INTO {table} VALUES(?,?,?)"
+    conn.insert(query, entry)
 
 def user(conn, config, User):
-    try:
-        time_ms = round(time.time()*1000)
-        cursor = conn.cursor()
-        user = [int(User.id), User.id, User.name, User.username, User.bio, User.location, User.url,User.join_date, User.join_time, User.tweets, User.following, User.followers, User.likes, User.media_count, User.is_private, User.is_verified, User.avatar, User.background_image]
+    time_ms = round(time.time()*1000)
+    user = [int(User.id), User.id, User.name, User.username, User.bio, User.location, User.url,User.join_date, User.join_time, User.tweets, User.following, User.followers, User.likes, User.media_count, User.is_private, User.is_verified, User.avatar, User.background_image]
 
-        hex_dig = hashlib.sha256(','.join(str(v) for v in user).encode()).hexdigest()
-        entry = tuple(user) + (hex_dig,time_ms,)
-        old_hash = get_hash_id(conn, User.id)
+    hex_dig = hashlib.sha256(','.join(str(v) for v in user).encode()).hexdigest()
+    entry = tuple(user) + (hex_dig,time_ms,)
+    old_hash = conn.hashes.get(int(User.id), -1)
 
-        if old_hash == -1 or old_hash != hex_dig:
-            query = f"INSERT INTO users VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
-            cursor.execute(query, entry)
-        else:
-            pass
+    if old_hash == -1 or old_hash != hex_dig:
+        query = f"INSERT OR IGNORE INTO users VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
+        conn.insert(query, entry)
+        conn.hashes[int(User.id)] = hex_dig
 
-        if config.Followers or config.Following:
-            table = uTable(config.Followers)
-            query = f"INSERT INTO {table} VALUES(?,?)"
-            cursor.execute(query, (config.User_id, int(User.id)))
-
-        conn.commit()
-    except sqlite3.IntegrityError:
-        pass
+    if config.Followers or config.Following:
+        table = uTable(config.Followers)
+        query = f"INSERT OR IGNORE INTO {table} VALUES(?,?)"
+        conn.insert(query, (config.User_id, int(User.id)))
 
 def tweets(conn, Tweet, config):
-    try:
-        time_ms = round(time.time()*1000)
-        cursor = conn.cursor()
-        entry = (Tweet.id,
-                    Tweet.id_str,
-                    Tweet.tweet,
-                    Tweet.conversation_id,
-                    Tweet.datetime,
-                    Tweet.datestamp,
-                    Tweet.timestamp,
-                    Tweet.timezone,
-                    Tweet.place,
-                    Tweet.replies_count,
-                    Tweet.likes_count,
-                    Tweet.retweets_count,
-                    Tweet.user_id,
-                    Tweet.user_id_str,
-                    Tweet.username,
-                    Tweet.name,
-                    Tweet.link,
-                    ",".join(Tweet.mentions),
-                    ",".join(Tweet.hashtags),
-                    ",".join(Tweet.cashtags),
-                    ",".join(Tweet.urls),
-                    ",".join(Tweet.photos),
-                    Tweet.quote_url,
-                    Tweet.video,
-                    Tweet.geo,
-                    Tweet.near,
-                    Tweet.source,
-                    time_ms,
-                    Tweet.translate,
-                    Tweet.trans_src,
-                    Tweet.trans_dest)
-        cursor.execute('INSERT INTO tweets VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)', entry)
+    time_ms = round(time.time()*1000)
+    entry = (Tweet.id,
+                Tweet.id_str,
+                Tweet.tweet,
+                Tweet.conversation_id,
+                Tweet.datetime,
+                Tweet.datestamp,
+                Tweet.timestamp,
+                Tweet.timezone,
+                Tweet.place,
+                Tweet.replies_count,
+                Tweet.likes_count,
+                Tweet.retweets_count,
+                Tweet.user_id,
+                Tweet.user_id_str,
+                Tweet.username,
+                Tweet.name,
+                Tweet.link,
+                ",".join(Tweet.mentions),
+                ",".join(Tweet.hashtags),
+                ",".join(Tweet.cashtags),
+                ",".join(Tweet.urls),
+                ",".join(Tweet.photos),
+                Tweet.quote_url,
+                Tweet.video,
+                Tweet.geo,
+                Tweet.near,
+                Tweet.source,
+                time_ms,
+                Tweet.translate,
+                Tweet.trans_src,
+                Tweet.trans_dest)
+    conn.insert('INSERT OR IGNORE INTO tweets VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)', entry)
 
-        if config.Favorites:
-            query = 'INSERT INTO favorites VALUES(?,?)'
-            cursor.execute(query, (config.User_id, Tweet.id))
+    if config.Favorites:
+        query = 'INSERT OR IGNORE INTO favorites VALUES(?,?)'
+        conn.insert(query, (config.User_id, Tweet.id))
 
-        if Tweet.retweet:
-            query = 'INSERT INTO retweets VALUES(?,?,?,?,?)'
-            _d = datetime.timestamp(datetime.strptime(Tweet.retweet_date, "%Y-%m-%d %H:%M:%S"))
-            cursor.execute(query, (int(Tweet.user_rt_id), Tweet.user_rt, Tweet.id, int(Tweet.retweet_id), _d))
-        
-        if Tweet.reply_to:
-            for reply in Tweet.reply_to:
-                query = 'INSERT INTO replies VALUES(?,?,?)'
-                cursor.execute(query, (Tweet.id, int(reply['user_id']), reply['username']))
+    if Tweet.retweet:
+        query = 'INSERT OR IGNORE INTO retweets VALUES(?,?,?,?,?)'
+        _d = datetime.timestamp(datetime.strptime(Tweet.retweet_date, "%Y-%m-%d %H:%M:%S"))
+        conn.insert(query, (int(Tweet.user_rt_id), Tweet.user_rt, Tweet.id, int(Tweet.retweet_id), _d))
 
-        conn.commit()
-    except sqlite3.IntegrityError:
-        pass
+    if Tweet.reply_to:
+        for reply in Tweet.reply_to:
+            query = 'INSERT OR IGNORE INTO replies VALUES(?,?,?)'
+            conn.insert(query, (Tweet.id, int(reply['user_id']), reply['username']))
@@ -1,10 +1,13 @@
 ## TODO - Fix Weekday situation
 from elasticsearch import Elasticsearch, helpers
-from geopy.geocoders import Nominatim
 from time import strftime, localtime
 import contextlib
+import atexit
+import time
 import sys
 
+from . import geocode
+
 _index_tweet_status = False
 _index_follow_status = False
 _index_user_status = False
@@ -13,24 +16,68 @@ _is_location_def = False
 _near = {}
 _location = {}
 
-geolocator = Nominatim(user_agent="twint-1.2")
+_es = None
+_es_hosts = None
+_actions = []
+_last_flush = time.time()
+_batch_size = 1000
+_threads = 4
 
 class RecycleObject(object):
     def write(self, junk): pass
     def flush(self): pass
 
-def getLocation(place, **options):
-    location = geolocator.geocode(place,timeout=1000)
+def client(config):
+    global _es
+    global _es_hosts
+    hosts = (config.Elasticsearch, config.Skip_certs)
+    if _es is None or _es_hosts != hosts:
+        flush()
+        _es = Elasticsearch(config.Elasticsearch, verify_certs=config.Skip_certs)
+        _es_hosts = hosts
+    return _es
+
+def bulk(action, config):
+    global _batch_size
+    global _threads
+    _batch_size = config.Elasticsearch_batch_size
+    _threads = config.Elasticsearch_threads
+    _actions.append(action)
+    if (len(_actions) >= _batch_size or
+            time.time() - _last_flush >= config.Elasticsearch_flush_interval):
+        flush()
+
+def flush():
+    global _last_flush
+    _last_flush = time.time()
+    if not _actions:
+        return
+    actions = _actions[:]
+    _actions.clear()
+    failed = 0
+    with nostdout():
+        for ok, item in helpers.parallel_bulk(_es, actions, thread_count=_threads,
+                                              chunk_size=_batch_size, request_timeout=200,
+                                              raise_on_error=False):
+            if not ok:
+                failed += 1
+    if failed:
+        print(f"[x] {failed} document(s) failed to index :: storage.elasticsearch.flush")
+
+atexit.register(flush)
+
+def getLocation(place, config, **options):
+    location = geocode.Location(place, config)
     if location:
         if options.get("near"):
             global _near
-            _near = {"lat": location.latitude, "lon": location.longitude}
+            _near = location
             return True
         elif options.get("location"):
             global _location
-            _location = {"lat": location.latitude, "lon": location.longitude}
+            _location = location
             return True
-        return {"lat": location.latitude, "lon": location.longitude}
+        return location
     else:
         return {}
 
@@ -208,8 +255,6 @@ def Tweet(Tweet, config):
             }
     day = weekdays[strftime("%A", localtime(Tweet.datetime/1000))]
 
-    actions = []
-
     dt = f"{Tweet.datestamp} {Tweet.timestamp}"
 
     j_data = {
@@ -272,32 +317,27 @@ def Tweet(Tweet, config):
                 __geo = config.Geo
             if config.Near:
                 __near = config.Near
-            _is_near_def = getLocation(__near + __geo, near=True)
+            _is_near_def = getLocation(__near + __geo, config, near=True)
         if _near:
             j_data["_source"].update({"geo_near": _near})
     if Tweet.place:
-        _t_place = getLocation(Tweet.place)
+        _t_place = getLocation(Tweet.place, config)
         if _t_place:
-            j_data["_source"].update({"geo_tweet": getLocation(Tweet.place)})
+            j_data["_source"].update({"geo_tweet": _t_place})
     if Tweet.source:
-        j_data["_source"].update({"source": Tweet.Source})
+        j_data["_source"].update({"source": Tweet.source})
     if config.Translate:
         j_data["_source"].update({"translate": Tweet.translate})        
         j_data["_source"].update({"trans_src": Tweet.trans_src})
         j_data["_source"].update({"trans_dest": Tweet.trans_dest})
 
-    actions.append(j_data)
-
-    es = Elasticsearch(config.Elasticsearch, verify_certs=config.Skip_certs)
+    es = client(config)
     if not _index_tweet_status:
         _index_tweet_status = createIndex(config, es, scope="tweet")
-    with nostdout():
-        helpers.bulk(es, actions, chunk_size=2000, request_timeout=200)
-    actions = []
+    bulk(j_data, config)
 
 def Follow(user, config):
     global _index_follow_status
-    actions = []
 
     if config.Following:
         _user = config.Username
@@ -314,19 +354,15 @@ def Follow(user, config):
                 "essid": config.Essid
                 }
             }
-    actions.append(j_data)
 
-    es = Elasticsearch(config.Elasticsearch, verify_certs=config.Skip_certs)
+    es = client(config)
     if not _index_follow_status:
         _index_follow_status = createIndex(config, es, scope="follow")
-    with nostdout():
-        helpers.bulk(es, actions, chunk_size=2000, request_timeout=200)
-    actions = []
+    bulk(j_data, config)
 
 def UserProfile(user, config):
     global _index_user_status
     global _is_location_def
-    actions = []
 
     j_data = {
             "_index": config.Index_users,
@@ -353,14 +389,11 @@ def UserProfile(user, config):
             }
     if config.Location:
         if not _is_location_def:
-            _is_location_def = getLocation(user.location, location=True)
+            _is_location_def = getLocation(user.location, config, location=True)
         if _location:
             j_data["_source"].update({"geo_user": _location})
-    actions.append(j_data)
 
-    es = Elasticsearch(config.Elasticsearch, verify_certs=config.Skip_certs)
+    es = client(config)
     if not _index_user_status:
         _index_user_status = createIndex(config, es, scope="user")
-    with nostdout():
-        helpers.bulk(es, actions, chunk_size=2000, request_timeout=200)
-    actions = []
+    bulk(j_data, config)
@@ -0,0 +1,46 @@
+from geopy.exc import GeopyError
+from geopy.extra.rate_limiter import RateLimiter
+from geopy.geocoders import Nominatim
+from .cache import Cache
+
+import logging as logme
+
+geolocator = Nominatim(user_agent="twint-1.2")
+
+_cache = Cache("places", "place", [("lat", "real"), ("lon", "real")])
+_geocode = None
+_geocode_delay = None
+
+def _key(place):
+    return " ".join(place.lower().split())
+
+def _limiter(config):
+    global _geocode
+    global _geocode_delay
+    if _geocode is None or _geocode_delay != config.Geocode_delay:
+        _geocode = RateLimiter(geolocator.geocode, min_delay_seconds=config.Geocode_delay,
+                               max_retries=0, swallow_exceptions=False)
+        _geocode_delay = config.Geocode_delay
+    return _geocode
+
+def Location(place, config):
+    """Geocode a place, going through the memory and sqlite caches first
+
+    Places that do not resolve are cached as {} as well. Lookups that
+    fail (timeouts, service errors) return {} without being cached.
+    """
+    key = _key(place)
+    row = _cache.get(key, config.Geocode_cache_size, config.Geocode_cache)
+    if row is not None:
+        return {"lat": row[0], "lon": row[1]} if row[0] is not None else {}
+
+    try:
+        found = _limiter(config)(place, timeout=config.Geocode_timeout)
+    except GeopyError as e:
+        logme.critical(__name__+':Location:' + str(e))
+        return {}
+
+    location = {"lat": found.latitude, "lon": found.longitude} if found else {}
+    _cache.put({key: (location.get("lat"), location.get("lon"))}, config.Geocode_cache_size,
+               config.Geocode_cache)
+    return location
@@ -1,19 +1,42 @@
 from time import strftime, localtime
 import pandas as pd
+import sys
 import warnings
 from .elasticsearch import hour
 
-Tweets_df = None
+# Tweets_df and User_df are built when read, through the module __getattr__
+# (PEP 562); on Python 3.6 _autoget has to build them after every run
+_lazy = sys.version_info >= (3, 7)
+
 Follow_df = None
-User_df = None
+if not _lazy:
+    Tweets_df = None
+    User_df = None
 
 _object_blocks = {
-    "tweet": [],
-    "user": [],
     "following": [],
     "followers": []
 }
 
+# tweet and user rows, kept as columns until a DataFrame is asked for
+_columns = {
+    "tweet": {},
+    "user": {}
+}
+
+# DataFrames of the rows collected by each run, concatenated when read
+_chunks = {
+    "tweet": [],
+    "user": []
+}
+
+_dataframes = {
+    "tweet": "Tweets_df",
+    "user": "User_df"
+}
+
+_collected = set()
+
 weekdays = {
         "Monday": 1,
         "Tuesday": 2,
@@ -34,17 +57,54 @@ def _concat(df, _type):
         df = pd.concat([df, _df], sort=True)
     return df
 
+def _append(_type, data):
+    columns = _columns[_type]
+    if not columns:
+        for key in data:
+            columns[key] = []
+    for key, value in data.items():
+        columns[key].append(value)
+
+def _chunk(_type):
+    """Convert the rows added since the last chunk to a DataFrame
+    """
+    columns = _columns[_type]
+    if columns:
+        _chunks[_type].append(pd.DataFrame(columns))
+        _columns[_type] = {}
+
+def Dataframe(_type):
+    """DataFrame of the tweets ("tweet") or users ("user") collected so far,
+    None if none were collected
+
+    Chunks added since the last call are concatenated once, here.
+    """
+    if _type not in _collected:
+        return None
+    _chunk(_type)
+    chunks = _chunks[_type]
+    if not chunks:
+        chunks.append(pd.DataFrame())
+    elif len(chunks) > 1:
+        chunks[:] = [pd.concat(chunks, ignore_index=True)]
+    return chunks[0]
+
+def __getattr__(name):
+    for _type, attribute in _dataframes.items():
+        if name == attribute:
+            return Dataframe(_type)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def _autoget(_type):
-    global Tweets_df
     global Follow_df
-    global User_df
 
-    if _type == "tweet":
-        Tweets_df = _concat(Tweets_df, _type)
+    if _type == "tweet" or _type == "user":
+        _collected.add(_type)
+        _chunk(_type)
+        if not _lazy:
+            globals()[_dataframes[_type]] = Dataframe(_type)
     elif _type == "followers" or _type == "following":
         Follow_df = _concat(Follow_df, _type)
-    elif _type == "user":
-        User_df = _concat(User_df, _type)
     else:
         error("[x] Wrong type of object passed")
 
@@ -103,7 +163,7 @@ def update(object, config):
             "trans_src": Tweet.trans_src,
             "trans_dest": Tweet.trans_dest
             }
-        _object_blocks[_type].append(_data)
+        _append(_type, _data)
     elif _type == "user":
         user = object
         _data = {
@@ -126,7 +186,7 @@ def update(object, config):
             "avatar": user.avatar,
             "background_image": user.background_image,
             }
-        _object_blocks[_type].append(_data)
+        _append(_type, _data)
     elif _type == "followers" or _type == "following":
         _data = {
             config.Following*"following" + config.Followers*"followers" :
@@ -138,16 +198,16 @@ def update(object, config):
 
 
 def clean():
-    global Tweets_df
     global Follow_df
-    global User_df
-    _object_blocks["tweet"].clear()
     _object_blocks["following"].clear()
     _object_blocks["followers"].clear()
-    _object_blocks["user"].clear()
-    Tweets_df = None
+    for _type in _columns:
+        _columns[_type] = {}
+        _chunks[_type] = []
+        if not _lazy:
+            globals()[_dataframes[_type]] = None
+    _collected.clear()
     Follow_df = None
-    User_df = None
 
 def save(_filename, _dataframe, **options):
     if options.get("dataname"):
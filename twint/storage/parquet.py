@@ -0,0 +1,151 @@
+from . import write_meta as meta
+from .write import addExt
+import atexit
+import os
+import uuid
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# open writers, by output path
+_writers = {}
+
+# columns written without dictionary encoding, they rarely repeat
+_plain = {"id", "conversation_id", "created_at", "tweet", "link", "urls", "photos",
+          "quote_url", "retweet_id", "bio", "url", "profile_image_url", "background_image"}
+
+def _types():
+    string = pa.string()
+    strings = pa.list_(pa.string())
+    return {
+        "tweet": {
+            "id": pa.int64(),
+            "created_at": pa.timestamp("ms"),
+            "user_id": pa.int64(),
+            "mentions": strings,
+            "urls": strings,
+            "photos": strings,
+            "replies_count": pa.int64(),
+            "retweets_count": pa.int64(),
+            "likes_count": pa.int64(),
+            "hashtags": strings,
+            "cashtags": strings,
+            "retweet": pa.bool_(),
+            "video": pa.int8(),
+            "reply_to": pa.list_(pa.struct([("user_id", string), ("username", string)])),
+        },
+        "user": {
+            "id": pa.int64(),
+            "tweets": pa.int64(),
+            "following": pa.int64(),
+            "followers": pa.int64(),
+            "likes": pa.int64(),
+            "media": pa.int64(),
+            "private": pa.int8(),
+            "verified": pa.int8(),
+        },
+        "username": {},
+    }
+
+def Schema(_type, fieldnames):
+    types = _types()[_type]
+    return pa.schema([(f, types.get(f, pa.string())) for f in fieldnames])
+
+def _value(value, _type):
+    if value is None or value == "":
+        return None if not pa.types.is_list(_type) else []
+    if pa.types.is_string(_type):
+        return str(value)
+    if pa.types.is_list(_type) and pa.types.is_string(_type.value_type):
+        return [str(v) for v in value]
+    return value
+
+def _leaves(path, _type):
+    if pa.types.is_list(_type):
+        return _leaves(path + ".list.element", _type.value_type)
+    if pa.types.is_struct(_type):
+        return [leaf for child in _type for leaf in _leaves(path + "." + child.name, child.type)]
+    return [path]
+
+def _dataset(path):
+    """Make path a dataset directory, moving in a single file written before
+    """
+    if os.path.isfile(path):
+        tmp = path + ".tmp"
+        os.replace(path, tmp)
+        os.makedirs(path)
+        os.replace(tmp, os.path.join(path, "part-0.parquet"))
+    os.makedirs(path, exist_ok=True)
+
+class _Writer:
+    """Row buffer written out as one Parquet row group at a time
+
+    The output is a dataset directory, each run adds its own part files,
+    so runs to the same output append like the CSV and JSON outputs do.
+    """
+    def __init__(self, path, schema, config):
+        self.path = path
+        self.schema = schema
+        self.row_group = config.Parquet_row_group
+        self.partition = config.Parquet_partition and "date" in schema.names
+        self.columns = {f: [] for f in schema.names}
+        self.rows = 0
+        self.dictionary = [path for field in schema if field.name not in _plain
+                           for path in _leaves(field.name, field.type)]
+        self.writer = None
+        _dataset(path)
+        if not self.partition:
+            self.writer = pq.ParquetWriter(os.path.join(path, f"part-{uuid.uuid4().hex}.parquet"),
+                                           schema, use_dictionary=self.dictionary)
+
+    def append(self, row):
+        for field in self.schema:
+            self.columns[field.name].append(_value(row[field.name], field.type))
+        self.rows += 1
+        if self.rows >= self.row_group:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        table = pa.Table.from_pydict(self.columns, schema=self.schema)
+        if self.partition:
+            pq.write_to_dataset(table, root_path=self.path, partition_cols=["date"],
+                                basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                                use_dictionary=self.dictionary)
+        else:
+            self.writer.write_table(table)
+        self.columns = {f: [] for f in self.schema.names}
+        self.rows = 0
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+
+def Parquet(obj, config):
+    if pa is None:
+        raise ImportError("Parquet output requires pyarrow (pip install pyarrow)")
+    _obj_type = obj.__class__.__name__
+    if _obj_type == "str":
+        _obj_type = "username"
+    custom = config.Custom[_obj_type]
+    data = meta.Data(obj, _obj_type)
+
+    base = addExt(config.Output, _obj_type, "parquet")
+
+    writer = _writers.get(base)
+    if writer is None:
+        fieldnames = custom if custom else meta.Fieldnames(_obj_type)
+        writer = _writers[base] = _Writer(base, Schema(_obj_type, fieldnames), config)
+    writer.append(data)
+
+def close():
+    for writer in _writers.values():
+        writer.close()
+    _writers.clear()
+
+atexit.register(close)
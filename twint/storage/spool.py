@@ -0,0 +1,98 @@
+from itertools import islice
+import atexit
+import os
+import pickle
+import shutil
+import tempfile
+
+from .. import trace
+
+# spools with segments on disk, removed at exit
+_spilled = set()
+
+class Spool:
+    """List-like collector keeping the most recent objects in memory
+
+    Once more than `limit` objects are held, the oldest quarter of them is
+    pickled to a segment file in a temporary directory. Iteration, len()
+    and indexing go through the segments and the in-memory objects in
+    insertion order. With no limit it is a plain in-memory list.
+    """
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.recent = []
+        self.segments = []
+        self.spilled = 0
+        self.directory = None
+        self._loaded = (None, None)
+
+    def append(self, obj):
+        self.recent.append(obj)
+        if self.limit and len(self.recent) > self.limit:
+            self.spill(max(self.limit // 4, 1))
+
+    def spill(self, count):
+        trace.event(__name__, 'Spool:spill')
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix="twint-spool-")
+            _spilled.add(self)
+        path = os.path.join(self.directory, f"{len(self.segments):08d}.pickle")
+        with open(path, "wb") as f:
+            pickle.dump(self.recent[:count], f, pickle.HIGHEST_PROTOCOL)
+        self.segments.append((path, count))
+        self.spilled += count
+        del self.recent[:count]
+
+    def _segment(self, path):
+        if self._loaded[0] != path:
+            with open(path, "rb") as f:
+                self._loaded = (path, pickle.load(f))
+        return self._loaded[1]
+
+    def __iter__(self):
+        for path, _ in self.segments:
+            with open(path, "rb") as f:
+                yield from pickle.load(f)
+        yield from self.recent
+
+    def __len__(self):
+        return self.spilled + len(self.recent)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step < 0:
+                return list(self)[index]
+            return list(islice(self, start, stop, step))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("spool index out of range")
+        if index >= self.spilled:
+            return self.recent[index - self.spilled]
+        for path, count in self.segments:
+            if index < count:
+                return self._segment(path)[index]
+            index -= count
+
+    def __repr__(self):
+        return f"<Spool {len(self)} objects, {self.spilled} on disk>"
+
+    def clear(self):
+        self.recent = []
+        self.segments = []
+        self.spilled = 0
+        self._loaded = (None, None)
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+            _spilled.discard(self)
+
+def _cleanup():
+    for spool in list(_spilled):
+        spool.clear()
+
+atexit.register(_cleanup)
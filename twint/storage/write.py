@@ -1,7 +1,52 @@
 from . import write_meta as meta
+import atexit
 import csv
 import json
 import os
+import time
+
+# open output files, by path
+_files = {}
+# output paths, by (base, object type, file type)
+_paths = {}
+# field projections, by (object type, custom fields)
+_fieldnames = {}
+
+class _File:
+    """Output file kept open for the whole run
+    """
+    def __init__(self, path, fieldnames=None):
+        exists = os.path.exists(path)
+        self.handle = open(path, "a", newline='', encoding="utf-8")
+        self.writer = None
+        if fieldnames is not None:
+            self.writer = csv.DictWriter(self.handle, fieldnames=fieldnames)
+            if not exists:
+                self.writer.writeheader()
+        self.last_flush = time.time()
+
+    def written(self, interval):
+        if time.time() - self.last_flush >= interval:
+            self.handle.flush()
+            self.last_flush = time.time()
+
+def _open(path, fieldnames=None):
+    _file = _files.get(path)
+    if _file is None:
+        _file = _files[path] = _File(path, fieldnames)
+    return _file
+
+def flush():
+    for _file in _files.values():
+        _file.handle.flush()
+        _file.last_flush = time.time()
+
+def close():
+    for _file in _files.values():
+        _file.handle.close()
+    _files.clear()
+
+atexit.register(close)
 
 def outputExt(objType, fType):
     if objType == "str":
@@ -11,14 +56,20 @@ def outputExt(objType, fType):
     return outExt
 
 def addExt(base, objType, fType):
-    if len(base.split('.')) == 1:
-        createDirIfMissing(base)
-        base += outputExt(objType, fType)
+    key = (base, objType, fType)
+    if key not in _paths:
+        path = base
+        if len(base.split('.')) == 1:
+            createDirIfMissing(base)
+            path += outputExt(objType, fType)
+        _paths[key] = path
 
-    return base
+    return _paths[key]
 
-def Text(entry, f):
-    print(entry.replace('\n', ' '), file=open(f, "a", encoding="utf-8"))
+def Text(entry, f, interval=1):
+    _file = _open(f)
+    print(entry.replace('\n', ' '), file=_file.handle)
+    _file.written(interval)
 
 def Type(config):
     if config.User_full:
@@ -30,15 +81,20 @@ def Type(config):
 
     return _type
 
+def Fieldnames(custom, _type):
+    key = (_type, tuple(custom) if custom else None)
+    if key not in _fieldnames:
+        _fieldnames[key] = list(custom) if custom else meta.Fieldnames(_type)
+
+    return _fieldnames[key]
+
 def struct(obj, custom, _type):
+    fieldnames = Fieldnames(custom, _type)
+    data = meta.Data(obj, _type)
     if custom:
-        fieldnames = custom
-        row = {}
-        for f in fieldnames:
-            row[f] = meta.Data(obj, _type)[f]
+        row = {f: data[f] for f in fieldnames}
     else:
-        fieldnames = meta.Fieldnames(_type)
-        row = meta.Data(obj, _type)
+        row = data
 
     return fieldnames, row
 
@@ -51,17 +107,12 @@ def Csv(obj, config):
     if _obj_type == "str":
         _obj_type = "username"
     fieldnames, row = struct(obj, config.Custom[_obj_type], _obj_type)
-    
+
     base = addExt(config.Output, _obj_type, "csv")
-    
-    if not (os.path.exists(base)):
-        with open(base, "w", newline='', encoding="utf-8") as csv_file:
-            writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
-            writer.writeheader()
 
-    with open(base, "a", newline='', encoding="utf-8") as csv_file:
-        writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
-        writer.writerow(row)
+    _file = _open(base, fieldnames)
+    _file.writer.writerow(row)
+    _file.written(config.Output_flush_interval)
 
 def Json(obj, config):
     _obj_type = obj.__class__.__name__
@@ -71,6 +122,7 @@ def Json(obj, config):
 
     base = addExt(config.Output, _obj_type, "json")
 
-    with open(base, "a", newline='', encoding="utf-8") as json_file:
-        json.dump(data, json_file, ensure_ascii=False)
-        json_file.write("\n")
+    _file = _open(base)
+    json.dump(data, _file.handle, ensure_ascii=False)
+    _file.handle.write("\n")
+    _file.written(config.Output_flush_interval)
@@ -0,0 +1,113 @@
+'''
+stream.py - Iterate over scraped objects as they arrive.
+
+    import twint
+
+    c = twint.Config()
+    c.Search = "python"
+    for tweet in twint.stream.search(c):
+        print(tweet.id, tweet.tweet)
+
+Each function has an async counterpart (asearch, aprofile, ...) to use
+with `async for` inside a running event loop, e.g. in a notebook.
+Configured outputs (files, database, Elasticsearch, ...) still run.
+'''
+from asyncio import (Queue, ensure_future, wait, FIRST_COMPLETED, get_event_loop,
+                     new_event_loop, set_event_loop, CancelledError)
+
+from . import run, trace
+
+
+# flags the run module sets for each kind of scrape
+_modes = {
+    "search": {"TwitterSearch": True, "Favorites": False, "Following": False,
+               "Followers": False, "Profile": False, "Profile_full": False},
+    "profile": {"Profile": True, "Favorites": False, "Following": False,
+                "Followers": False, "TwitterSearch": False},
+    "favorites": {"Favorites": True, "Following": False, "Followers": False,
+                  "Profile": False, "Profile_full": False, "TwitterSearch": False},
+    "followers": {"Followers": True, "Following": False, "Profile": False,
+                  "Profile_full": False, "Favorites": False, "TwitterSearch": False},
+    "following": {"Following": True, "Followers": False, "Profile": False,
+                  "Profile_full": False, "Favorites": False, "TwitterSearch": False},
+}
+
+async def _stream(config, mode):
+    """Yield tweets, users or usernames from the scrape as they are output
+
+    At most config.Stream_buffer objects wait for the consumer, the
+    scrape is paused while the buffer is full.
+    """
+    trace.event(__name__, '_stream')
+    for key, value in _modes[mode].items():
+        setattr(config, key, value)
+    queue = Queue(max(config.Stream_buffer, 1))
+    config.Stream_queue = queue
+    task = ensure_future(run.engine(config))
+    try:
+        while True:
+            get = ensure_future(queue.get())
+            await wait([get, task], return_when=FIRST_COMPLETED)
+            if get.done():
+                yield get.result()
+                continue
+            get.cancel()
+            while not queue.empty():
+                yield queue.get_nowait()
+            # raises the exception that ended the scrape, if any
+            task.result()
+            return
+    finally:
+        config.Stream_queue = None
+        if not task.done():
+            # let the run close its session and flush its outputs
+            task.cancel()
+            try:
+                await task
+            except CancelledError:
+                pass
+
+def _sync(agen):
+    try:
+        loop = get_event_loop()
+    except RuntimeError:
+        loop = new_event_loop()
+        set_event_loop(loop)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(agen.aclose())
+
+def asearch(config):
+    return _stream(config, "search")
+
+def aprofile(config):
+    return _stream(config, "profile")
+
+def afavorites(config):
+    return _stream(config, "favorites")
+
+def afollowers(config):
+    return _stream(config, "followers")
+
+def afollowing(config):
+    return _stream(config, "following")
+
+def search(config):
+    return _sync(asearch(config))
+
+def profile(config):
+    return _sync(aprofile(config))
+
+def favorites(config):
+    return _sync(afavorites(config))
+
+def followers(config):
+    return _sync(afollowers(config))
+
+def following(config):
+    return _sync(afollowing(config))
@@ -0,0 +1,121 @@
+'''
+trace.py - Lightweight tracing of what a scrape is doing.
+
+Call sites name their event with two constant strings, the module and
+the event, so nothing is built unless tracing is on:
+
+    trace.event(__name__, 'Tweet')
+    with trace.span(__name__, 'RequestUrl'):
+        ...
+
+When off, an event is one function call and a flag check, and a span is
+a shared no-op context manager. When on (config.Trace, or TWINT_DEBUG=debug),
+the latest config.Trace_buffer events, with span durations, are kept in a
+ring buffer that is written to config.Trace_file if the run fails, and
+can be written at any time with trace.dump(path). With TWINT_DEBUG=debug
+events are also logged, as the debug log did before.
+'''
+from collections import deque
+from datetime import datetime
+import time
+
+import logging as logme
+
+enabled = False
+_log = False
+_ring = deque(maxlen=10000)
+
+def enable(size=None, log=None):
+    """Start recording, keeping the last size events
+    """
+    global enabled
+    global _log
+    global _ring
+    if size and size != _ring.maxlen:
+        _ring = deque(_ring, maxlen=size)
+    if log is not None:
+        _log = log
+    enabled = True
+
+def disable():
+    global enabled
+    enabled = False
+
+def _record(module, name, duration=None):
+    _ring.append((time.time(), module, name, duration))
+    if _log:
+        if duration is None:
+            logme.debug(module + ':' + name)
+        else:
+            logme.debug('{}:{}:{:.6f}s'.format(module, name, duration))
+
+def event(module, name):
+    if enabled:
+        _record(module, name)
+
+class _Span:
+    __slots__ = ("module", "name", "start")
+
+    def __init__(self, module, name):
+        self.module = module
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.module, self.name, time.perf_counter() - self.start)
+        return False
+
+class _Noop:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_noop = _Noop()
+
+def span(module, name):
+    """Context manager recording an event with the time spent in the block
+    """
+    if enabled:
+        return _Span(module, name)
+    return _noop
+
+def events():
+    """Recorded events, oldest first, as (time, "module:name", seconds or None)
+    """
+    return [(t, module + ':' + name, duration) for t, module, name, duration in _ring]
+
+def dump(path):
+    """Write the recorded events to path, oldest first
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for t, name, duration in events():
+            stamp = datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S.%f")
+            if duration is None:
+                f.write(f"{stamp} {name}\n")
+            else:
+                f.write(f"{stamp} {name} {duration * 1000:.3f}ms\n")
+
+def clear():
+    _ring.clear()
+
+async def Traced(coro, config):
+    """Await coro with tracing on, dump the trace to config.Trace_file if it fails
+    """
+    _enabled = enabled
+    enable(config.Trace_buffer)
+    try:
+        return await coro
+    except (Exception, KeyboardInterrupt):
+        logme.critical(__name__+':Traced:dump:' + str(config.Trace_file))
+        dump(config.Trace_file)
+        raise
+    finally:
+        if not _enabled:
+            disable()
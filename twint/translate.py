@@ -0,0 +1,102 @@
+from asyncio import get_event_loop, gather, Semaphore
+from collections import OrderedDict, namedtuple
+import hashlib
+
+from . import trace
+from .storage.cache import Cache
+
+import logging as logme
+
+Translation = namedtuple("Translation", ["text", "src", "dest"])
+
+_cache = Cache("translations", "key", [("text", "text"), ("src", "text"), ("dest", "text")])
+_google = None
+
+class Google:
+    """Google Translate through googletransx, one blocking request per text
+    """
+    def __init__(self):
+        # ref.
+        # - https://github.com/x0rzkov/py-googletrans#basic-usage
+        from googletransx import Translator
+        self.translator = Translator()
+
+    def translate(self, texts, dest):
+        translations = []
+        for text in texts:
+            ts = self.translator.translate(text=text, dest=dest)
+            translations.append(Translation(ts.text, ts.src, ts.dest))
+        return translations
+
+class Echo:
+    """Translator that returns texts unchanged, for tests and dry runs
+    """
+    def __init__(self, src="auto"):
+        self.src = src
+
+    def translate(self, texts, dest):
+        return [Translation(text, self.src, dest) for text in texts]
+
+def _translator(config):
+    global _google
+    if config.Translator is not None:
+        return config.Translator
+    if _google is None:
+        _google = Google()
+    return _google
+
+def _key(text, dest):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest() + ":" + dest
+
+def _store(translations, config):
+    _cache.put(translations, config.Translate_cache_size, config.Translate_cache)
+
+async def _batch(translator, texts, dest, semaphore):
+    async with semaphore:
+        return await get_event_loop().run_in_executor(None, translator.translate, texts, dest)
+
+async def Tweets(tweets, config):
+    """Fill translate, trans_src and trans_dest of a batch of tweets
+
+    Cached translations are used first, the remaining distinct texts are
+    sent to the translator in batches of Translate_batch_size, at most
+    Translate_concurrency batches at a time, off the event loop.
+    """
+    trace.event(__name__, 'Tweets')
+    dest = config.TranslateDest
+    pending = OrderedDict()
+    for t in tweets:
+        key = _key(t.tweet, dest)
+        translation = _cache.get(key, config.Translate_cache_size, config.Translate_cache)
+        if translation is not None:
+            t.translate, t.trans_src, t.trans_dest = translation
+        else:
+            pending.setdefault(key, []).append(t)
+
+    if not pending:
+        return
+
+    translator = _translator(config)
+    keys = list(pending)
+    size = max(config.Translate_batch_size, 1)
+    chunks = [keys[i:i+size] for i in range(0, len(keys), size)]
+    semaphore = Semaphore(max(config.Translate_concurrency, 1))
+    results = await gather(*[_batch(translator, [pending[key][0].tweet for key in chunk], dest, semaphore)
+                             for chunk in chunks], return_exceptions=True)
+
+    translated = {}
+    for chunk, result in zip(chunks, results):
+        # ref. https://github.com/SuniTheFish/ChainTranslator/blob/master/ChainTranslator/__main__.py#L31
+        if isinstance(result, ValueError):
+            raise Exception("Invalid destination language: {}".format(dest))
+        if isinstance(result, Exception):
+            logme.critical(__name__+':Tweets:' + str(result))
+            continue
+        for key, translation in zip(chunk, result):
+            translation = Translation(*translation)
+            translated[key] = translation
+            for t in pending[key]:
+                t.translate, t.trans_src, t.trans_dest = translation
+
+    if translated:
+        _store(translated, config)
@@ -1,10 +1,16 @@
 import datetime
 from sys import platform
-import logging as logme
+from . import trace
 
 mobile = "https://mobile.twitter.com"
 base = "https://twitter.com/i"
 
+def _base(config):
+    return f"{config.Base_url}/i" if config is not None else base
+
+def _mobile(config):
+    return config.Mobile_url if config is not None else mobile
+
 def _sanitizeQuery(base,params):
     _serialQuery = ""
     for p in params:
@@ -20,45 +26,45 @@ def _formatDate(date):
     except ValueError:
         return int(datetime.datetime.strptime(date, "%Y-%m-%d").timestamp())
 
-async def Favorites(username, init):
-    logme.debug(__name__+':Favorites')
-    url = f"{mobile}/{username}/favorites?lang=en"
+async def Favorites(username, init, config=None):
+    trace.event(__name__, 'Favorites')
+    url = f"{_mobile(config)}/{username}/favorites?lang=en"
 
     if init != '-1':
         url += f"&max_id={init}"
 
     return url
 
-async def Followers(username, init):
-    logme.debug(__name__+':Followers')
-    url = f"{mobile}/{username}/followers?lang=en"
+async def Followers(username, init, config=None):
+    trace.event(__name__, 'Followers')
+    url = f"{_mobile(config)}/{username}/followers?lang=en"
 
     if init != '-1':
         url += f"&cursor={init}"
 
     return url
 
-async def Following(username, init):
-    logme.debug(__name__+':Following')
-    url = f"{mobile}/{username}/following?lang=en"
+async def Following(username, init, config=None):
+    trace.event(__name__, 'Following')
+    url = f"{_mobile(config)}/{username}/following?lang=en"
 
     if init != '-1':
         url += f"&cursor={init}"
 
     return url
 
-async def MobileProfile(username, init):
-    logme.debug(__name__+':MobileProfile')
-    url = f"{mobile}/{username}?lang=en"
+async def MobileProfile(username, init, config=None):
+    trace.event(__name__, 'MobileProfile')
+    url = f"{_mobile(config)}/{username}?lang=en"
 
     if init != '-1':
         url += f"&max_id={init}"
 
     return url
 
-async def Profile(username, init):
-    logme.debug(__name__+':Profile')
-    url = f"{base}/profiles/show/{username}/timeline/tweets?include_"
+async def Profile(username, init, config=None):
+    trace.event(__name__, 'Profile')
+    url = f"{_base(config)}/profiles/show/{username}/timeline/tweets?include_"
     url += "available_features=1&lang=en&include_entities=1"
     url += "&include_new_items_bar=true"
 
@@ -68,8 +74,8 @@ async def Profile(username, init):
     return url
 
 async def Search(config, init):
-    logme.debug(__name__+':Search')
-    url = f"{base}/search/timeline"
+    trace.event(__name__, 'Search')
+    url = f"{_base(config)}/search/timeline"
     q = ""
     params = [
         ('vertical', 'default'),
@@ -1,13 +1,17 @@
-import logging as logme
+from . import trace
 
 class user:
     type = "user"
 
+    __slots__ = ("id", "name", "username", "bio", "location", "url", "join_date",
+                 "join_time", "tweets", "following", "followers", "likes", "media_count",
+                 "is_private", "is_verified", "avatar", "background_image")
+
     def __init__(self):
         pass
 
 def inf(ur, _type):
-    logme.debug(__name__+':inf')
+    trace.event(__name__, 'inf')
     try:
         group = ur.find("div", "user-actions btn-group not-following ")
         if group == None:
@@ -33,7 +37,7 @@ def inf(ur, _type):
     return ret
 
 def card(ur, _type):
-    logme.debug(__name__+':card')
+    trace.event(__name__, 'card')
     if _type == "bio":
         try:
             ret = ur.find("p", "ProfileHeaderCard-bio u-dir").text.replace("\n", " ")
@@ -54,12 +58,12 @@ def card(ur, _type):
     return ret
 
 def join(ur):
-    logme.debug(__name__+':join')
+    trace.event(__name__, 'join')
     jd = ur.find("span", "ProfileHeaderCard-joinDateText js-tooltip u-dir")["title"]
     return jd.split(" - ")
 
 def convertToInt(x):
-    logme.debug(__name__+':contertToInt')
+    trace.event(__name__, 'contertToInt')
     multDict = {
         "k" : 1000,
         "m" : 1000000,
@@ -83,7 +87,7 @@ def convertToInt(x):
     return 0
 
 def stat(ur, _type):
-    logme.debug(__name__+':stat')
+    trace.event(__name__, 'stat')
     _class = f"ProfileNav-item ProfileNav-item--{_type}"
     stat = ur.find("li", _class)
     try :
@@ -92,7 +96,7 @@ def stat(ur, _type):
         return 0
 
 def media(ur):
-    logme.debug(__name__+':media')
+    trace.event(__name__, 'media')
     try:
         media_count = ur.find("a", "PhotoRail-headingWithCount js-nav").text.strip().split(" ")[0]
         return convertToInt(media_count)
@@ -100,7 +104,7 @@ def media(ur):
         return 0
 
 def verified(ur):
-    logme.debug(__name__+':verified')
+    trace.event(__name__, 'verified')
     try:
         is_verified = ur.find("span", "ProfileHeaderCard-badges").text
         if "Verified account" in is_verified:
@@ -113,7 +117,7 @@ def verified(ur):
     return is_verified
 
 def User(ur):
-    logme.debug(__name__+':User')
+    trace.event(__name__, 'User')
     u = user()
     for img in ur.findAll("img", "Emoji Emoji--forText"):
         img.replaceWith(img["alt"])